@@ -304,9 +304,16 @@ async def _memory_select(
 ):
     recent_mem = set(parent_memories)
     all_mem = set(parent_memories)
+    max_level = max(compacted_level_num, raw_pair_level_num)
     for mem in parent_memories:
-        recent_mem.update(memory_store.get_ancestors(mem, level=compacted_level_num))
-        all_mem.update(memory_store.get_ancestors(mem, level=raw_pair_level_num))
+        # One walk per parent; both windows are cut from the recorded depths.
+        depths = memory_store.get_ancestor_depths(mem, level=max_level)
+        recent_mem.update(
+            id_ for id_, depth in depths.items() if depth <= compacted_level_num
+        )
+        all_mem.update(
+            id_ for id_, depth in depths.items() if depth <= raw_pair_level_num
+        )
 
     all_mem_rec = memory_store.get_by_ids(all_mem)
     return all_mem_rec, recent_mem
@@ -13,7 +13,13 @@ from collections.abc import Awaitable, Callable
 from logging import getLogger
 from typing import Protocol, cast
 
-from pydantic import BaseModel, field_validator, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    ValidationInfo,
+    field_validator,
+    model_validator,
+)
 from pydantic_ai import ModelRetry, RunContext
 
 from k.agent.channels import (
@@ -28,7 +34,13 @@ logger = getLogger(__name__)
 
 
 class Event(BaseModel):
-    """Structured input event with hierarchical channel routing."""
+    """Structured input event with hierarchical channel routing.
+
+    Events are immutable once validated; `out_channel` is normalized during
+    field validation (same-as-input is stored as `None`).
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     in_channel: str
     out_channel: str | None = None
@@ -55,18 +67,18 @@ class Event(BaseModel):
 
     @field_validator("out_channel")
     @classmethod
-    def _validate_out_channel(cls, value: str | None) -> str | None:
+    def _validate_out_channel(
+        cls, value: str | None, info: ValidationInfo
+    ) -> str | None:
         if value is None:
             return None
-        return validate_channel_path(value, field_name="out_channel")
-
-    @model_validator(mode="after")
-    def _normalize_out_channel(self) -> Event:
-        self.out_channel = normalize_out_channel(
-            in_channel=self.in_channel,
-            out_channel=self.out_channel,
-        )
-        return self
+        value = validate_channel_path(value, field_name="out_channel")
+        # `in_channel` is declared first, so it is already validated here
+        # (absent only when it failed, in which case validation errors anyway).
+        in_channel = info.data.get("in_channel")
+        if not isinstance(in_channel, str):
+            return value
+        return normalize_out_channel(in_channel=in_channel, out_channel=value)
 
     @property
     def effective_out_channel(self) -> str:
@@ -77,6 +89,8 @@ class Event(BaseModel):
 
 
 class MemoryHint(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     referenced_memory_ids: list[str]
     from_where_and_response_to_where: str
     user_intents: str
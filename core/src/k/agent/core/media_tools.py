@@ -13,6 +13,7 @@ Security notes:
 
 from __future__ import annotations
 
+import functools
 import mimetypes
 import os
 from pathlib import Path
@@ -95,15 +96,42 @@ def _is_generic_binary_media_type(media_type: str) -> bool:
     return mt in {"application/octet-stream", "binary/octet-stream"}
 
 
+def _kind_from_guessed_type(
+    guessed_type: str | None,
+) -> tuple[bool, UrlMediaKind | None]:
+    """Return `(decided, kind)`; `decided=False` means "sniff the URL"."""
+
+    if not guessed_type:
+        return False, None
+    if _is_generic_binary_media_type(guessed_type):
+        return True, None
+    kind = _url_kind_from_media_type(guessed_type)
+    return kind is not None, kind
+
+
+@functools.lru_cache(maxsize=256)
+def _kind_for_extension(ext: str) -> tuple[bool, UrlMediaKind | None]:
+    return _kind_from_guessed_type(mimetypes.guess_type(f"x{ext}")[0])
+
+
+def _kind_for_url_path(path: str) -> tuple[bool, UrlMediaKind | None]:
+    """Classify a URL path by extension, memoized per extension.
+
+    Compression/alias suffixes (e.g. `.gz`, `.tgz`) make `mimetypes` look at
+    more than the last extension, so those paths take the uncached route.
+    """
+
+    ext = os.path.splitext(path)[1]
+    lowered = ext.lower()
+    if lowered in mimetypes.encodings_map or lowered in mimetypes.suffix_map:
+        return _kind_from_guessed_type(mimetypes.guess_type(path)[0])
+    return _kind_for_extension(ext)
+
+
 async def _infer_url_kind(url: str) -> UrlMediaKind | None:
-    path = urlparse(url).path
-    guessed_type, _ = mimetypes.guess_type(path)
-    if guessed_type:
-        if _is_generic_binary_media_type(guessed_type):
-            return None
-        kind = _url_kind_from_media_type(guessed_type)
-        if kind:
-            return kind
+    decided, kind = _kind_for_url_path(urlparse(url).path)
+    if decided:
+        return kind
 
     sniffed_type = await _sniff_url_media_type(url)
     if sniffed_type:
@@ -20,15 +20,28 @@ ID scheme
 Note: because the id is derived from millisecond resolution, two records created
 in the same millisecond would collide; stores should continue to reject duplicate
 ids on append.
+
+Validation
+----------
+Constructing a `MemoryRecord` normally runs the full pydantic validation
+(channel paths, id shape for `id_`/`parents`/`children`). Store loaders that
+have already validated the on-disk payload against an equivalent schema may use
+`MemoryRecord.load_trusted()` to skip the second pass; it must never be used for
+external input. `is_memory_record_id` is memoized because parent/child ids
+repeat heavily across a store.
 """
 
 from __future__ import annotations
 
+import functools
 import re
-from datetime import UTC, datetime
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+from typing import Any, Final
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 from pydantic_ai.messages import ModelRequest, ModelResponse
+from pydantic_core import to_json
 
 from k.agent.channels import (
     effective_out_channel,
@@ -36,31 +49,33 @@ from k.agent.channels import (
     validate_channel_path,
 )
 
-_ORDERED_B64_MILLIS_8_RE = re.compile(r"^[-0-9A-Z_a-z]{8}$")
+_MEMORY_RECORD_ID_LEN = 8
+# Compiled once at import; always used with `fullmatch`, so no anchors.
+_ORDERED_B64_MILLIS_8_RE: Final[re.Pattern[str]] = re.compile(r"[-0-9A-Z_a-z]{8}")
 _ORDERED_B64_ALPHABET = (
     "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
 )
-_ORDERED_B64_DECODE = {ch: idx for idx, ch in enumerate(_ORDERED_B64_ALPHABET)}
+# Most-significant 6-bit group first, so string order matches numeric order.
+_ID_SHIFTS = (42, 36, 30, 24, 18, 12, 6, 0)
 
 _EPOCH_UTC = datetime(1970, 1, 1, tzinfo=UTC)
+_ONE_MILLISECOND = timedelta(milliseconds=1)
 
 
 def _datetime_to_posix_millis(value: datetime) -> int:
     """Return the integer POSIX milliseconds represented by `value`.
 
-    For timezone-aware datetimes, prefer integer delta arithmetic over
-    `datetime.timestamp()` to avoid float rounding affecting the millisecond
-    value (and therefore id ordering).
-
-    For naive datetimes, defer to `datetime.timestamp()` which interprets the
-    value in the system local timezone.
+    Uses integer timedelta arithmetic rather than `datetime.timestamp()` so
+    float rounding cannot shift the millisecond value (and therefore id
+    ordering). Naive datetimes are interpreted in the system local timezone,
+    exactly as `datetime.timestamp()` does; only their whole-second part goes
+    through it, which is exact in a float.
     """
 
     if value.tzinfo is None:
-        return int(value.timestamp() * 1000)
-
-    delta = value.astimezone(UTC) - _EPOCH_UTC
-    return delta.days * 86_400_000 + delta.seconds * 1000 + (delta.microseconds // 1000)
+        seconds = int(value.replace(microsecond=0).timestamp())
+        return seconds * 1000 + value.microsecond // 1000
+    return (value - _EPOCH_UTC) // _ONE_MILLISECOND
 
 
 def memory_record_id_from_millis(millis: int) -> str:
@@ -69,10 +84,7 @@ def memory_record_id_from_millis(millis: int) -> str:
     if millis < 0 or millis >= 1 << 48:
         raise ValueError(f"created_at millis out of range for 48-bit id: {millis}")
 
-    chars: list[str] = []
-    for shift in range(42, -1, -6):
-        chars.append(_ORDERED_B64_ALPHABET[(millis >> shift) & 0x3F])
-    return "".join(chars)
+    return "".join([_ORDERED_B64_ALPHABET[(millis >> s) & 0x3F] for s in _ID_SHIFTS])
 
 
 def memory_record_id_from_created_at(created_at: datetime) -> str:
@@ -85,18 +97,34 @@ def memory_record_id_from_created_at(created_at: datetime) -> str:
     return memory_record_id_from_millis(_datetime_to_posix_millis(created_at))
 
 
+@functools.lru_cache(maxsize=1 << 16)
 def is_memory_record_id(value: str) -> bool:
-    """Return true if `value` is a valid MemoryRecord id string."""
+    """Return true if `value` is a valid MemoryRecord id string.
+
+    Results are cached (bounded LRU); `value` must be hashable.
+
+    Any 8 alphabet characters encode exactly 48 bits, so a shape match already
+    implies the decoded value is in range; no per-character decode is needed.
+    Legacy UUID-style ids are rejected by the length check before any regex work.
+    """
 
-    if not _ORDERED_B64_MILLIS_8_RE.fullmatch(value):
+    if len(value) != _MEMORY_RECORD_ID_LEN:
         return False
-    decoded = 0
-    for ch in value:
-        digit = _ORDERED_B64_DECODE.get(ch)
-        if digit is None:
-            return False
-        decoded = (decoded << 6) | digit
-    return 0 <= decoded < (1 << 48)
+    return _ORDERED_B64_MILLIS_8_RE.fullmatch(value) is not None
+
+
+def validate_memory_record_ids(
+    *, id_: str, parents: Iterable[str], children: Iterable[str]
+) -> None:
+    """Raise `ValueError` unless `id_` and every linked id are valid record ids."""
+
+    if not is_memory_record_id(id_):
+        raise ValueError(f"Invalid MemoryRecord id: {id_!r}")
+
+    for link_name, ids in (("parents", parents), ("children", children)):
+        bad = [i for i in ids if not is_memory_record_id(i)]
+        if bad:
+            raise ValueError(f"Invalid MemoryRecord {link_name} id(s): {bad!r}")
 
 
 class MemoryRecord(BaseModel):
@@ -140,15 +168,23 @@ class MemoryRecord(BaseModel):
 
         if not self.id_:
             self.id_ = memory_record_id_from_created_at(self.created_at)
-        if not is_memory_record_id(self.id_):
-            raise ValueError(f"Invalid MemoryRecord id: {self.id_!r}")
-
-        for link_name, ids in (("parents", self.parents), ("children", self.children)):
-            bad = [i for i in ids if not is_memory_record_id(i)]
-            if bad:
-                raise ValueError(f"Invalid MemoryRecord {link_name} id(s): {bad!r}")
+        validate_memory_record_ids(
+            id_=self.id_, parents=self.parents, children=self.children
+        )
         return self
 
+    @classmethod
+    def load_trusted(cls, data: dict[str, Any]) -> MemoryRecord:
+        """Build a record from already-validated field values without validation.
+
+        Intended for store loaders whose on-disk schema has already checked
+        channels and ids (see `k.agent.memory.folder`). Callers must pass a
+        non-empty `id_` and a normalized `out_channel`; no defaults are derived
+        and nothing is checked here.
+        """
+
+        return cls.model_construct(**data)
+
     @property
     def effective_out_channel(self) -> str:
         return effective_out_channel(
@@ -160,10 +196,22 @@ class MemoryRecord(BaseModel):
     def short_id(self) -> str:
         return self.id_[:8]
 
+    def _meta_json(self) -> str:
+        """Serialize the id/link metadata embedded in prompt dumps.
+
+        Same bytes as `model_dump_json(include={"id_", "parents", "children"})`
+        without walking the full model schema. Not cached: stores append to
+        `children` in place.
+        """
+
+        return to_json(
+            {"id_": self.id_, "parents": self.parents, "children": self.children}
+        ).decode()
+
     def dump_raw_pair(self) -> str:
         # return self.model_dump_json(exclude={"detailed", "compacted"})
-        return f"""<Meta>{self.model_dump_json(include={"id_", "parents", "children"})}</Meta><Instruct>{self.input}</Instruct><Response>{self.output}</Response>"""
+        return f"""<Meta>{self._meta_json()}</Meta><Instruct>{self.input}</Instruct><Response>{self.output}</Response>"""
 
     def dump_compated(self) -> str:
         # return self.model_dump_json(exclude={"detailed"})
-        return f"""<Meta>{self.model_dump_json(include={"id_", "parents", "children"})}</Meta><Instruct>{self.input}</Instruct><Process>{self.compacted}</Process><Response>{self.output}</Response>"""
+        return f"""<Meta>{self._meta_json()}</Meta><Instruct>{self.input}</Instruct><Process>{self.compacted}</Process><Response>{self.output}</Response>"""
@@ -17,10 +17,15 @@ Layout (relative to `root`):
   persisted in this detailed file.
 
 Design notes / invariants:
+- Split-format records are validated once via `_CoreRecordOnDisk` (which mirrors
+  `MemoryRecord`'s channel/id checks) and then assembled with
+  `MemoryRecord.load_trusted()`; keep the two schemas' checks in sync.
 - "Latest" means the last id in `order.jsonl` (append order), not necessarily the
   max `created_at`.
 - Parsing is strict: invalid ids in `order.jsonl`, invalid JSON, or invalid
   `MemoryRecord` data raises `ValueError` with path/line context.
+- All reads parse with pydantic-core's compiled `from_json` (same accepted
+  syntax as `json.loads` for these files).
 - `MemoryRecord` loading expects channel fields (`in_channel`, optional
   `out_channel`). Legacy `kind`-only records are not read directly; migrate them
   first via `k.agent.memory.folder_migrate_kind_to_channel`.
@@ -32,23 +37,34 @@ Design notes / invariants:
 
 from __future__ import annotations
 
+import codecs
 import json
-import tempfile
+import os
 from collections.abc import Set
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 from pathlib import Path
+from typing import cast
 
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
 from pydantic_ai.messages import BaseToolCallPart, ModelResponse
+from pydantic_core import from_json
 
-from k.agent.memory.entities import MemoryRecord
+from k.agent.channels import normalize_out_channel, validate_channel_path
+from k.agent.memory.entities import (
+    MemoryRecord,
+    is_memory_record_id,
+    validate_memory_record_ids,
+)
 from k.agent.memory.store import (
     MemoryRecordId,
     MemoryRecordRef,
     MemoryStore,
     coerce_record_id,
 )
+from k.agent.memory.utils import atomic_write_bytes, write_bytes_if_changed
 
 
 @dataclass(slots=True)
@@ -76,7 +92,11 @@ _CORE_FIELDS: set[str] = {
 
 
 class _CoreRecordOnDisk(BaseModel):
-    """On-disk schema for `<id>.core.json` in the split core/detailed format."""
+    """On-disk schema for `<id>.core.json` in the split core/detailed format.
+
+    Applies the same channel/id checks as `MemoryRecord`, so the loaded record
+    can be assembled with `MemoryRecord.load_trusted()` without validating twice.
+    """
 
     created_at: datetime
     in_channel: str
@@ -86,9 +106,44 @@ class _CoreRecordOnDisk(BaseModel):
     children: list[str] = Field(default_factory=list)
     compacted: list[str] = Field(default_factory=list)
 
+    @field_validator("in_channel")
+    @classmethod
+    def _validate_in_channel(cls, value: str) -> str:
+        return validate_channel_path(value, field_name="in_channel")
+
+    @field_validator("out_channel")
+    @classmethod
+    def _validate_out_channel(cls, value: str | None) -> str | None:
+        if value is None:
+            return None
+        return validate_channel_path(value, field_name="out_channel")
+
+    @model_validator(mode="after")
+    def _normalize_and_validate_ids(self) -> _CoreRecordOnDisk:
+        self.out_channel = normalize_out_channel(
+            in_channel=self.in_channel,
+            out_channel=self.out_channel,
+        )
+        validate_memory_record_ids(
+            id_=self.id_, parents=self.parents, children=self.children
+        )
+        return self
+
+
+@dataclass(frozen=True, slots=True)
+class _SiblingPaths:
+    """Sidecar files that belong to one record file."""
+
+    detailed: Path
+    legacy_compacted: Path
 
-def _compacted_sidecar_path_for_record_path(record_path: Path) -> Path:
-    """Return the legacy `*.compacted.json` sidecar path for `record_path`."""
+
+def _sibling_paths_for_record_path(record_path: Path) -> _SiblingPaths:
+    """Return the sidecar paths for a record path, parsing its filename once.
+
+    The record path may be the canonical `<id>.core.json` file or a legacy
+    `<id>.json` file referenced by old `order.jsonl` entries.
+    """
 
     name = record_path.name
     if name.endswith(".core.json"):
@@ -97,18 +152,66 @@ def _compacted_sidecar_path_for_record_path(record_path: Path) -> Path:
         record_id = name[: -len(".json")]
     else:
         raise ValueError(f"Unexpected record filename: {record_path}")
-    return record_path.with_name(f"{record_id}.compacted.json")
+    parent = record_path.parent
+    return _SiblingPaths(
+        detailed=parent / f"{record_id}.detailed.jsonl",
+        legacy_compacted=parent / f"{record_id}.compacted.json",
+    )
+
+
+def _coerce_tool_call(item: object) -> dict[str, object] | None:
+    """Return `item` as a `{"tool_name", "args"}` dict, or `None` if malformed.
+
+    Items that already hold exactly those keys (as `_encode_detailed_jsonl`
+    writes them) are returned as-is instead of being copied.
+    """
+
+    if not isinstance(item, dict):
+        return None
+    data = cast(dict[str, object], item)
+    tool_name = data.get("tool_name")
+    if not isinstance(tool_name, str) or not tool_name:
+        return None
+    args = data.get("args")
+    if args is not None and not isinstance(args, (str, dict)):
+        return None
+    if len(data) == 2 and "args" in data:
+        return data
+    return {"tool_name": tool_name, "args": args}
+
+
+def _as_utf8(data: bytes, *, encoding: str, path: Path) -> bytes:
+    """Return `data` (read from `path` in `encoding`) as UTF-8 for `from_json`."""
+
+    if codecs.lookup(encoding).name == "utf-8":
+        return data
+    try:
+        return data.decode(encoding).encode("utf-8")
+    except UnicodeError as e:
+        raise ValueError(f"Failed to decode {path}: {e}") from e
 
 
 def _read_detailed_file(
     path: Path, *, encoding: str
 ) -> tuple[str, str, list[list[dict[str, object]]]]:
-    """Read `<id>.detailed.jsonl` JSONL as `(input, output, tool_calls_by_response)`."""
+    """Read `<id>.detailed.jsonl` JSONL as `(input, output, tool_calls_by_response)`.
+
+    Lines are split on `b"\\n"` only and each slice is parsed straight from
+    bytes. Unlike `str.splitlines()`, this never splits inside a JSON string
+    holding a raw U+2028/U+2029 (the encoder writes `ensure_ascii=False`).
+
+    Raises:
+        FileNotFoundError: If `path` does not exist (callers report the id).
+        ValueError: On any other read error or malformed content.
+    """
 
     try:
-        lines = path.read_text(encoding=encoding).splitlines()
+        data = path.read_bytes()
+    except FileNotFoundError:
+        raise
     except OSError as e:
         raise ValueError(f"Failed to read detailed file: {path}: {e}") from e
+    lines = _as_utf8(data, encoding=encoding, path=path).split(b"\n")
 
     input_line_no: int | None = None
     input_value: str | None = None
@@ -124,7 +227,7 @@ def _read_detailed_file(
         if input_value is None:
             input_line_no = line_no
             try:
-                decoded = json.loads(line)
+                decoded = from_json(line)
             except ValueError as e:
                 raise ValueError(f"Invalid JSON at {path}:{line_no}: {e}") from e
             if not isinstance(decoded, str):
@@ -137,7 +240,7 @@ def _read_detailed_file(
         if output_value is None:
             output_line_no = line_no
             try:
-                decoded = json.loads(line)
+                decoded = from_json(line)
             except ValueError as e:
                 raise ValueError(f"Invalid JSON at {path}:{line_no}: {e}") from e
             if not isinstance(decoded, str):
@@ -148,7 +251,7 @@ def _read_detailed_file(
             continue
 
         try:
-            decoded = json.loads(line)
+            decoded = from_json(line)
         except ValueError as e:
             raise ValueError(f"Invalid JSON at {path}:{line_no}: {e}") from e
         if not isinstance(decoded, list):
@@ -157,21 +260,13 @@ def _read_detailed_file(
             )
         tool_calls: list[dict[str, object]] = []
         for idx, item in enumerate(decoded):
-            if not isinstance(item, dict):
-                raise ValueError(
-                    f"Invalid detailed file at {path}:{line_no}: tool_calls[{idx}] must be an object"
-                )
-            tool_name = item.get("tool_name")
-            if not isinstance(tool_name, str) or not tool_name:
+            tool_call = _coerce_tool_call(item)
+            if tool_call is None:
                 raise ValueError(
-                    f"Invalid detailed file at {path}:{line_no}: tool_calls[{idx}].tool_name must be a non-empty string"
+                    f"Invalid detailed file at {path}:{line_no}: tool_calls[{idx}] must be an object "
+                    "with a non-empty string tool_name and string, object, or null args"
                 )
-            args = item.get("args")
-            if args is not None and not isinstance(args, (str, dict)):
-                raise ValueError(
-                    f"Invalid detailed file at {path}:{line_no}: tool_calls[{idx}].args must be a string, object, or null"
-                )
-            tool_calls.append({"tool_name": tool_name, "args": args})
+            tool_calls.append(tool_call)
         tool_calls_by_response.append(tool_calls)
 
     if input_value is None:
@@ -211,10 +306,9 @@ def _encode_detailed_jsonl(record: MemoryRecord) -> str:
 
 def _load_memory_record_from_disk(
     record_path: Path,
-    raw_core: str,
+    raw_core: bytes,
     *,
     encoding: str,
-    detailed_path: Path,
 ) -> MemoryRecord:
     """Load a `MemoryRecord` from disk, supporting legacy and split formats.
 
@@ -225,16 +319,21 @@ def _load_memory_record_from_disk(
     Split format:
     - `<id>.core.json` stores metadata + `compacted`.
     - `<id>.detailed.jsonl` stores raw `input` + `output` + per-response tool-call lists.
+
+    `raw_core` is the undecoded file content (in `encoding`).
     """
 
+    raw_core = _as_utf8(raw_core, encoding=encoding, path=record_path)
     try:
-        decoded = json.loads(raw_core)
+        decoded = from_json(raw_core)
     except ValueError as e:
         raise ValueError(f"Invalid JSON at {record_path}: {e}") from e
 
     if not isinstance(decoded, dict):
         raise ValueError(f"Invalid MemoryRecord JSON at {record_path}: expected object")
 
+    siblings = _sibling_paths_for_record_path(record_path)
+
     # Legacy core files include `input`.
     if "input" in decoded:
         try:
@@ -242,46 +341,46 @@ def _load_memory_record_from_disk(
         except ValidationError as e:
             raise e
 
-        if "compacted" not in decoded:
-            compacted_path = _compacted_sidecar_path_for_record_path(record_path)
-            if compacted_path.exists():
-                record = record.model_copy(
-                    update={
-                        "compacted": _read_legacy_compacted_sidecar(
-                            compacted_path, encoding=encoding
-                        )
-                    }
-                )
+        if "compacted" not in decoded and siblings.legacy_compacted.exists():
+            record = record.model_copy(
+                update={
+                    "compacted": _read_legacy_compacted_sidecar(
+                        siblings.legacy_compacted, encoding=encoding
+                    )
+                }
+            )
 
         return record
 
     core = _CoreRecordOnDisk.model_validate(decoded)
 
     # Backward compatibility: some stores used a `*.compacted.json` sidecar.
-    if "compacted" not in decoded:
-        compacted_path = _compacted_sidecar_path_for_record_path(record_path)
-        if compacted_path.exists():
-            core.compacted = _read_legacy_compacted_sidecar(
-                compacted_path, encoding=encoding
-            )
-
-    if not detailed_path.exists():
-        raise ValueError(f"Missing detailed file for id {core.id_}: {detailed_path}")
+    if "compacted" not in decoded and siblings.legacy_compacted.exists():
+        core.compacted = _read_legacy_compacted_sidecar(
+            siblings.legacy_compacted, encoding=encoding
+        )
 
-    input_value, output_value, _tool_calls_by_response = _read_detailed_file(
-        detailed_path, encoding=encoding
-    )
-    return MemoryRecord(
-        created_at=core.created_at,
-        in_channel=core.in_channel,
-        out_channel=core.out_channel,
-        id_=core.id_,
-        parents=list(core.parents),
-        children=list(core.children),
-        input=input_value,
-        compacted=list(core.compacted),
-        output=output_value,
-        detailed=[],
+    try:
+        input_value, output_value, _tool_calls_by_response = _read_detailed_file(
+            siblings.detailed, encoding=encoding
+        )
+    except FileNotFoundError as e:
+        raise ValueError(
+            f"Missing detailed file for id {core.id_}: {siblings.detailed}"
+        ) from e
+    return MemoryRecord.load_trusted(
+        {
+            "created_at": core.created_at,
+            "in_channel": core.in_channel,
+            "out_channel": core.out_channel,
+            "id_": core.id_,
+            "parents": list(core.parents),
+            "children": list(core.children),
+            "input": input_value,
+            "compacted": list(core.compacted),
+            "output": output_value,
+            "detailed": [],
+        }
     )
 
 
@@ -291,7 +390,7 @@ def _read_legacy_compacted_sidecar(path: Path, *, encoding: str) -> list[str]:
     except OSError as e:
         raise ValueError(f"Failed to read compacted sidecar: {path}: {e}") from e
     try:
-        decoded = json.loads(raw)
+        decoded = from_json(raw)
     except ValueError as e:
         raise ValueError(f"Invalid JSON at {path}: {e}") from e
     if not isinstance(decoded, list) or any(
@@ -303,11 +402,59 @@ def _read_legacy_compacted_sidecar(path: Path, *, encoding: str) -> list[str]:
     return decoded
 
 
+# Below this many record files an index rebuild reads headers serially.
+_REBUILD_PARALLEL_MIN_FILES = 64
+_REBUILD_MAX_WORKERS = 16
+
+# Enough for the leading `created_at`, channels and `id_` of a typical core
+# file (dumped in that order).
+_HEADER_PROBE_BYTES = 256
+
+
+def _read_record_header(path: Path, *, encoding: str) -> tuple[str, datetime]:
+    """Return `(id_, created_at)` for a record file, reading as little as possible.
+
+    Record files are named `<id>.core.json` (or legacy `<id>.json`), and the
+    core dump leads with `created_at`, the channels and `id_`. For UTF-8
+    stores a partial parse of the first few hundred bytes is enough when the
+    `id_` found there matches the filename. Anything unexpected (non-id
+    filename, other encodings, fields beyond the probe, or a filename that
+    disagrees with the content) falls back to parsing the whole file, so the
+    index always uses the id stored in the record.
+    """
+
+    stem = path.name.removesuffix(".json").removesuffix(".core")
+    if is_memory_record_id(stem) and codecs.lookup(encoding).name == "utf-8":
+        try:
+            with path.open("rb") as f:
+                head = f.read(_HEADER_PROBE_BYTES)
+            partial = from_json(head, allow_partial=True)
+        except OSError as e:
+            raise ValueError(f"Failed to read MemoryRecord at {path}: {e}") from e
+        except ValueError:
+            partial = None
+        if (
+            isinstance(partial, dict)
+            and partial.get("id_") == stem
+            and isinstance(raw_created_at := partial.get("created_at"), str)
+        ):
+            try:
+                return stem, datetime.fromisoformat(raw_created_at)
+            except ValueError:
+                pass
+
+    try:
+        raw = path.read_text(encoding=encoding)
+    except OSError as e:
+        raise ValueError(f"Failed to read MemoryRecord at {path}: {e}") from e
+    return _read_record_id_and_created_at(raw, path=path)
+
+
 def _read_record_id_and_created_at(raw: str, *, path: Path) -> tuple[str, datetime]:
     """Return `(id_, created_at)` for a record file (legacy or split core)."""
 
     try:
-        decoded = json.loads(raw)
+        decoded = from_json(raw)
     except ValueError as e:
         raise ValueError(f"Invalid JSON at {path}: {e}") from e
 
@@ -340,17 +487,25 @@ class FolderMemoryStore(MemoryStore):
     root: Path
     encoding: str
 
+    _order_file: Path
+    _records_root: Path
     _cache_key: _CacheKey | None
     _records: list[MemoryRecord]
     _by_id: dict[str, MemoryRecord]
+    # Position of each id in `_records` (append order), for stable sorting.
+    _order_index: dict[str, int]
     _record_paths: dict[str, Path]
 
     def __init__(self, root: str | Path, *, encoding: str = "utf-8") -> None:
         self.root = Path(root)
         self.encoding = encoding
+        # Derived once; `root` is not expected to change after construction.
+        self._order_file = self.root / "order.jsonl"
+        self._records_root = self.root / "records"
         self._cache_key = None
         self._records = []
         self._by_id = {}
+        self._order_index = {}
         self._record_paths = {}
 
     def refresh(self) -> None:
@@ -380,7 +535,7 @@ class FolderMemoryStore(MemoryStore):
             raise KeyError(f"Missing record(s): {missing_str}")
 
         records = [self._by_id[id_] for id_ in record_ids if id_ in self._by_id]
-        order = {record.id_: idx for idx, record in enumerate(self._records)}
+        order = self._order_index
         records.sort(key=lambda r: (r.created_at, order.get(r.id_, 1_000_000_000)))
         return records
 
@@ -388,13 +543,7 @@ class FolderMemoryStore(MemoryStore):
         self, record: MemoryRecordRef, *, strict: bool = False
     ) -> list[str]:
         self._load_if_needed()
-        rec = self._coerce_record(record)
-        if strict:
-            missing = [id_ for id_ in rec.parents if id_ not in self._by_id]
-            if missing:
-                missing_str = ", ".join(str(i) for i in missing)
-                raise KeyError(f"Missing parent record(s): {missing_str}")
-        return list(rec.parents)
+        return list(self._checked_parents(self._coerce_record(record), strict=strict))
 
     def get_children(
         self, record: MemoryRecordRef, *, strict: bool = False
@@ -415,6 +564,22 @@ class FolderMemoryStore(MemoryStore):
         level: int | None = None,
         strict: bool = False,
     ) -> list[str]:
+        return list(self.get_ancestor_depths(record, level=level, strict=strict))
+
+    def get_ancestor_depths(
+        self,
+        record: MemoryRecordRef,
+        *,
+        level: int | None = None,
+        strict: bool = False,
+    ) -> dict[str, int]:
+        """Return `{ancestor_id: depth}` in `get_ancestors` order.
+
+        `depth` is the shortest parent-hop distance from `record` (direct
+        parents are 1), so one walk to the largest depth of interest answers
+        every smaller `level` by filtering on the value.
+        """
+
         if level is not None and level < 0:
             raise ValueError(f"level must be >= 0 or None; got {level}")
 
@@ -422,31 +587,42 @@ class FolderMemoryStore(MemoryStore):
         current = self._coerce_record(record)
 
         if level == 0:
-            return []
-
-        ancestors: list[str] = []
-        seen: set[str] = set()
-
-        frontier = self.get_parents(current, strict=strict)
-        depth = 0
-        while frontier and (level is None or depth < level):
-            depth += 1
-            next_frontier: list[str] = []
-            for parent_id in frontier:
-                if parent_id in seen:
-                    continue
-                seen.add(parent_id)
-                ancestors.append(parent_id)
-
-                parent_record = self._by_id.get(parent_id)
-                if parent_record is None:
-                    if strict:
-                        raise KeyError(f"Unknown parent MemoryRecord id: {parent_id}")
-                    continue
-                next_frontier.extend(self.get_parents(parent_record, strict=strict))
-            frontier = next_frontier
+            return {}
+
+        # Breadth-first walk over the in-memory index using one flat queue and
+        # a read cursor (no per-level list rebuilds). `level_end` marks where
+        # the current depth stops in `queue`; ids already seen are skipped when
+        # popped rather than filtered when enqueued, which keeps the output
+        # order of a level-by-level walk. Hot-loop methods are bound to locals.
+        get_record = self._by_id.get
+        queue: list[str] = list(self._checked_parents(current, strict=strict))
+        depths: dict[str, int] = {}
+
+        head = 0
+        level_end = len(queue)
+        depth = 1
+        while head < len(queue):
+            if head == level_end:
+                if level is not None and depth >= level:
+                    break
+                depth += 1
+                level_end = len(queue)
+            parent_id = queue[head]
+            head += 1
+            if parent_id in depths:
+                continue
+            depths[parent_id] = depth
+
+            # Strict mode already rejected missing ids in `_checked_parents`.
+            parent_record = get_record(parent_id)
+            if parent_record is not None:
+                queue.extend(
+                    self._checked_parents(parent_record, strict=True)
+                    if strict
+                    else parent_record.parents
+                )
 
-        return ancestors
+        return depths
 
     def get_between(
         self,
@@ -493,57 +669,38 @@ class FolderMemoryStore(MemoryStore):
                 updated_parents.append(parent)
 
         for parent in updated_parents:
-            self._persist_record(parent)
+            # Only `children` changed, which lives in the core file. Loaded
+            # records carry `detailed=[]`, so re-encoding their detailed file
+            # would drop its tool-call lines.
+            self._persist_record(parent, core_only=True)
 
         record_path = self._persist_record(record)
         self._append_order_line(record, record_path)
 
+        self._order_index[record.id_] = len(self._records)
         self._records.append(record)
         self._by_id[record.id_] = record
         self._cache_key = self._stat_key()
 
-    def _detailed_path_for_record_path(self, record_path: Path) -> Path:
-        """Return the sibling detailed path for a record path.
-
-        The record path may be the canonical `<id>.core.json` file or a legacy
-        `<id>.json` file referenced by old `order.jsonl` entries.
-        """
-
-        name = record_path.name
-        if name.endswith(".core.json"):
-            record_id = name[: -len(".core.json")]
-        elif name.endswith(".json") and not name.endswith(
-            (".detailed.json", ".detailed.jsonl")
-        ):
-            record_id = name[: -len(".json")]
-        else:
-            raise ValueError(f"Unexpected record filename: {record_path}")
-        return record_path.with_name(f"{record_id}.detailed.jsonl")
-
     def _load_if_needed(self) -> None:
-        if not self.root.exists():
-            self._cache_key = None
-            self._records = []
-            self._by_id = {}
-            self._record_paths = {}
-            return
-
-        order_path = self._order_path()
-        if not order_path.exists():
-            self._rebuild_order_from_records()
-
+        # Hot path (every query): a single `stat()` of `order.jsonl`. The root
+        # existence check and rebuild only run when that file is missing.
         key = self._stat_key()
+        if key is None and self.root.exists():
+            self._rebuild_order_from_records()
+            key = self._stat_key()
         if key is None:
             self._cache_key = None
             self._records = []
             self._by_id = {}
+            self._order_index = {}
             self._record_paths = {}
             return
 
         if self._cache_key is not None and key == self._cache_key:
             return
 
-        order_entries = _read_order_file(self._order_path(), encoding=self.encoding)
+        order_entries = _read_order_file(self._order_file, encoding=self.encoding)
 
         records: list[MemoryRecord] = []
         by_id: dict[str, MemoryRecord] = {}
@@ -570,7 +727,8 @@ class FolderMemoryStore(MemoryStore):
                     if core.exists():
                         record_path = core
             try:
-                raw = record_path.read_text(encoding=self.encoding)
+                # Bytes go straight to the JSON parser (no text-mode decode).
+                raw = record_path.read_bytes()
             except FileNotFoundError as e:
                 raise ValueError(
                     f"Missing record file for id {entry.id_}: {record_path}"
@@ -580,7 +738,6 @@ class FolderMemoryStore(MemoryStore):
                     record_path,
                     raw,
                     encoding=self.encoding,
-                    detailed_path=self._detailed_path_for_record_path(record_path),
                 )
             except ValidationError as e:
                 raise ValueError(
@@ -604,6 +761,7 @@ class FolderMemoryStore(MemoryStore):
 
         self._records = records
         self._by_id = by_id
+        self._order_index = {record.id_: idx for idx, record in enumerate(records)}
         self._record_paths = record_paths
         self._cache_key = key
 
@@ -614,31 +772,38 @@ class FolderMemoryStore(MemoryStore):
             self._persist_order([])
             return
 
-        indexed: list[tuple[str, datetime, str]] = []
-        for path in records_dir.rglob("*.json"):
-            if path.name.endswith(".detailed.json"):
-                continue
-            if path.name.endswith(".detailed.jsonl"):
-                continue
-            if path.name.endswith(".compacted.json"):
-                continue
-            if (
-                path.name.endswith(".json")
-                and not path.name.endswith(".core.json")
-                and (path.with_name(f"{path.stem}.core.json")).exists()
-            ):
-                # If both legacy "<id>.json" and "<id>.core.json" exist, the core
-                # file is authoritative.
-                continue
-            try:
-                raw = path.read_text(encoding=self.encoding)
-            except OSError as e:
-                raise ValueError(f"Failed to read MemoryRecord at {path}: {e}") from e
-            try:
-                record_id, created_at = _read_record_id_and_created_at(raw, path=path)
-            except ValueError as e:
-                raise ValueError(f"{e}") from e
-            indexed.append((record_id, created_at, str(path.relative_to(self.root))))
+        paths: list[Path] = []
+        # Walk with `os.walk` (scandir-based) and check for a sibling core file
+        # against the directory listing instead of a `stat()` per candidate.
+        for dirpath, _dirnames, filenames in os.walk(records_dir):
+            names_in_dir = set(filenames)
+            for name in filenames:
+                if not name.endswith(".json"):
+                    continue
+                if name.endswith((".detailed.json", ".compacted.json")):
+                    continue
+                if (
+                    not name.endswith(".core.json")
+                    and f"{name[: -len('.json')]}.core.json" in names_in_dir
+                ):
+                    # If both legacy "<id>.json" and "<id>.core.json" exist, the
+                    # core file is authoritative.
+                    continue
+                paths.append(Path(dirpath, name))
+
+        # Header reads are small and latency-bound (the GIL is released while
+        # waiting on I/O), so fan them out over threads for larger trees.
+        read_header = partial(_read_record_header, encoding=self.encoding)
+        if len(paths) < _REBUILD_PARALLEL_MIN_FILES:
+            headers = list(map(read_header, paths))
+        else:
+            with ThreadPoolExecutor(max_workers=_REBUILD_MAX_WORKERS) as pool:
+                headers = list(pool.map(read_header, paths))
+
+        indexed = [
+            (record_id, created_at, str(path.relative_to(self.root)))
+            for path, (record_id, created_at) in zip(paths, headers, strict=True)
+        ]
 
         # Stable order for rebuilds: by created_at then id.
         indexed.sort(key=lambda t: (t[1], str(t[0])))
@@ -661,10 +826,10 @@ class FolderMemoryStore(MemoryStore):
         return _CacheKey(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
 
     def _order_path(self) -> Path:
-        return self.root / "order.jsonl"
+        return self._order_file
 
     def _records_dir(self) -> Path:
-        return self.root / "records"
+        return self._records_root
 
     def _record_path_for(self, record: MemoryRecord) -> Path:
         return self._record_path_for_id_and_created_at(record.id_, record.created_at)
@@ -682,38 +847,34 @@ class FolderMemoryStore(MemoryStore):
         )
 
     def _atomic_write_text(self, path: Path, text: str) -> None:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        tmp_dir = path.parent if path.parent.exists() else None
-        with tempfile.NamedTemporaryFile(
-            "w",
-            encoding=self.encoding,
-            dir=tmp_dir,
-            prefix=f".{path.name}.",
-            suffix=".tmp",
-            delete=False,
-        ) as tf:
-            tmp_path = Path(tf.name)
-            tf.write(text)
-        tmp_path.replace(path)
-
-    def _persist_record(self, record: MemoryRecord) -> Path:
+        atomic_write_bytes(path, text.encode(self.encoding))
+
+    def _persist_record(self, record: MemoryRecord, *, core_only: bool = False) -> Path:
+        """Write `record` in the split layout and return its core path.
+
+        `core_only=True` rewrites just the core file and keeps the existing
+        detailed file as is. It is ignored when the record is not yet stored
+        as `<id>.core.json` (new or legacy), since that needs both files.
+        """
+
         path = self._record_paths.get(record.id_)
         if path is None or not path.name.endswith(".core.json"):
             path = self._record_path_for(record)
+            core_only = False
 
         # Split persistence:
         # - core: metadata + channel routing + compacted (one JSON blob, one line)
         # - detailed: raw input + output + tool_calls per response (JSONL)
-        self._atomic_write_text(
+        # Files whose bytes would not change are not rewritten.
+        write_bytes_if_changed(
             path,
-            record.model_dump_json(include=_CORE_FIELDS),
-        )
-
-        detailed_path = self._detailed_path_for_record_path(path)
-        self._atomic_write_text(
-            detailed_path,
-            _encode_detailed_jsonl(record),
+            record.model_dump_json(include=_CORE_FIELDS).encode(self.encoding),
         )
+        if not core_only:
+            write_bytes_if_changed(
+                _sibling_paths_for_record_path(path).detailed,
+                _encode_detailed_jsonl(record).encode(self.encoding),
+            )
 
         self._record_paths[record.id_] = path
         return path
@@ -741,6 +902,16 @@ class FolderMemoryStore(MemoryStore):
             }
             f.write(json.dumps(payload) + "\n")
 
+    def _checked_parents(self, record: MemoryRecord, *, strict: bool) -> list[str]:
+        """Return `record.parents` (not copied), validating them when `strict`."""
+
+        if strict:
+            missing = [id_ for id_ in record.parents if id_ not in self._by_id]
+            if missing:
+                missing_str = ", ".join(str(i) for i in missing)
+                raise KeyError(f"Missing parent record(s): {missing_str}")
+        return record.parents
+
     def _coerce_record(self, record: MemoryRecordRef) -> MemoryRecord:
         if isinstance(record, MemoryRecord):
             return record
@@ -765,7 +936,7 @@ def _read_order_file(path: Path, *, encoding: str) -> list[_OrderEntry]:
             if not line:
                 continue
             try:
-                decoded = json.loads(line)
+                decoded = from_json(line)
             except ValueError as e:
                 raise ValueError(f"Invalid JSON at {path}:{line_no}: {e}") from e
 
@@ -13,6 +13,26 @@ It is intentionally scoped to FolderMemoryStore on-disk files:
 It skips sidecar/detail files (`*.detailed.jsonl`, `*.detailed.json`,
 `*.compacted.json`).
 
+JSON is parsed/encoded with pydantic-core's compiled `from_json`/`to_json`
+(already a dependency via pydantic); `to_json` output is minified and keeps
+non-ASCII text unescaped, matching the store's
+`json.dumps(..., ensure_ascii=False, separators=(",", ":"))` format.
+
+Applying the migration fans record files out to a process pool in contiguous
+chunks of the sorted path list (so one hour directory usually stays within one
+worker). Each record file is migrated independently; reports are merged in
+submission order so error output stays deterministic. Dry runs stay
+single-process.
+
+Journal: after an applied run migrates every record file in a directory
+without errors, a `.migrated_v1` marker is written there holding the
+directory's `st_mtime_ns` and record-file count. Later runs skip a directory
+whose marker still matches (one `stat()` instead of reading and parsing each
+file). Record files are always replaced via rename, which bumps the
+directory mtime, so any added/removed/rewritten record invalidates the
+marker. Only a directory's own files are skipped; subdirectories carry their
+own markers. Pass `rescan=True` (`--rescan`) to ignore markers.
+
 Telegram legacy-note:
 - For records with `kind="telegram"`, the migration tries to infer
   `in_channel=telegram/chat/<chat_id>` from the stored input payload.
@@ -23,13 +43,18 @@ Telegram legacy-note:
 from __future__ import annotations
 
 import argparse
-import json
-import tempfile
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 from typing import Any, cast
 
+from pydantic_core import from_json, to_json
+
 from k.agent.channels import validate_channel_path
+from k.agent.memory.utils import atomic_write_bytes
 from k.starters.telegram.compact import extract_chat_id
 
 
@@ -40,18 +65,39 @@ class MigrationReport:
     scanned_files: int = 0
     changed_files: int = 0
     unchanged_files: int = 0
+    skipped_files: int = 0
     errors: list[str] = field(default_factory=list)
+    failed_paths: list[Path] = field(default_factory=list)
 
     @property
     def has_errors(self) -> bool:
         return bool(self.errors)
 
+    def merge(self, other: MigrationReport) -> None:
+        """Fold `other`'s counts and errors into this report."""
+
+        self.scanned_files += other.scanned_files
+        self.changed_files += other.changed_files
+        self.unchanged_files += other.unchanged_files
+        self.skipped_files += other.skipped_files
+        self.errors.extend(other.errors)
+        self.failed_paths.extend(other.failed_paths)
+
+
+# Files per worker task; large enough to amortize pickling/IPC per task.
+_CHUNK_SIZE = 256
+
+_JOURNAL_NAME = ".migrated_v1"
+_JOURNAL_TOOL = "kind_to_channel_v1"
+
 
 def migrate_folder_memory_kind_to_channel(
     root: str | Path,
     *,
     encoding: str = "utf-8",
     dry_run: bool = True,
+    max_workers: int | None = None,
+    rescan: bool = False,
 ) -> MigrationReport:
     """Migrate FolderMemoryStore record files under `root`.
 
@@ -59,9 +105,15 @@ def migrate_folder_memory_kind_to_channel(
         root: FolderMemoryStore root (contains `records/` and `order.jsonl`).
         encoding: File encoding used for reads/writes.
         dry_run: If true, only report what would change.
+        max_workers: Process pool size when applying; defaults to
+            `os.cpu_count()`. Ignored for dry runs and single-chunk trees.
+        rescan: If true, ignore `.migrated_v1` journal markers and migrate
+            every record file.
 
     Returns:
-        A migration report with counts and any per-file errors.
+        A migration report with counts and any per-file errors. Failures to
+        write a journal marker are reported as errors too (the migration
+        itself is still complete).
     """
 
     report = MigrationReport()
@@ -69,11 +121,54 @@ def migrate_folder_memory_kind_to_channel(
     if not records_root.exists():
         return report
 
-    for path in _iter_record_json_files(records_root):
+    record_counts, report.skipped_files = _scan_record_dirs(records_root, rescan=rescan)
+    paths = sorted(
+        Path(dirpath, name)
+        for dirpath, names in record_counts.items()
+        for name in names
+    )
+    chunks = [paths[i : i + _CHUNK_SIZE] for i in range(0, len(paths), _CHUNK_SIZE)]
+    migrate_chunk = partial(_migrate_chunk, encoding=encoding, dry_run=dry_run)
+
+    if dry_run or len(chunks) <= 1:
+        for chunk in chunks:
+            report.merge(migrate_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            for partial_report in pool.map(migrate_chunk, chunks):
+                report.merge(partial_report)
+
+    if not dry_run:
+        failed_dirs = {str(path.parent) for path in report.failed_paths}
+        for dirpath, names in record_counts.items():
+            if dirpath in failed_dirs:
+                continue
+            # The marker is only a rescan shortcut: failing to write it (e.g.
+            # read-only directory, ENOSPC) must not lose the finished report.
+            try:
+                _write_journal(Path(dirpath), count=len(names))
+            except OSError as e:
+                report.errors.append(
+                    f"{Path(dirpath, _JOURNAL_NAME)}: journal write failed: "
+                    f"{type(e).__name__}: {e}"
+                )
+    return report
+
+
+def _migrate_chunk(
+    paths: list[Path], *, encoding: str, dry_run: bool
+) -> MigrationReport:
+    """Migrate `paths` in order and return a report for just this chunk.
+
+    Module-level (not a closure) so it can be pickled for the process pool.
+    """
+
+    report = MigrationReport()
+    for path in paths:
         report.scanned_files += 1
         try:
             raw = path.read_text(encoding=encoding)
-            decoded = json.loads(raw)
+            decoded = from_json(raw)
             changed, migrated = _migrate_record_payload(
                 decoded,
                 path=path,
@@ -82,30 +177,79 @@ def migrate_folder_memory_kind_to_channel(
             if changed:
                 report.changed_files += 1
                 if not dry_run:
-                    payload = json.dumps(
-                        migrated,
-                        ensure_ascii=False,
-                        separators=(",", ":"),
-                    )
-                    _atomic_write_text(path=path, text=payload, encoding=encoding)
+                    payload = to_json(migrated).decode("utf-8")
+                    atomic_write_bytes(path, payload.encode(encoding))
             else:
                 report.unchanged_files += 1
         except Exception as e:
             report.errors.append(f"{path}: {type(e).__name__}: {e}")
+            report.failed_paths.append(path)
 
     return report
 
 
-def _iter_record_json_files(records_root: Path) -> list[Path]:
-    files: list[Path] = []
-    for path in records_root.rglob("*.json"):
-        name = path.name
-        if name.endswith(".detailed.json"):
+def _scan_record_dirs(
+    records_root: Path, *, rescan: bool
+) -> tuple[dict[str, list[str]], int]:
+    """Return `({dirpath: record file names}, skipped file count)`.
+
+    Directories with a current journal marker are left out unless `rescan`.
+    """
+
+    # `os.walk` is scandir-based: entry types come from the directory listing,
+    # so no per-file `stat()` or `Path` object is needed for skipped names.
+    record_names: dict[str, list[str]] = {}
+    skipped = 0
+    for dirpath, _dirnames, filenames in os.walk(records_root):
+        names = [
+            name
+            for name in filenames
+            if name.endswith(".json")
+            and not name.endswith((".detailed.json", ".compacted.json"))
+        ]
+        if not names:
             continue
-        if name.endswith(".compacted.json"):
+        if (
+            not rescan
+            and _JOURNAL_NAME in filenames
+            and _journal_is_current(Path(dirpath), count=len(names))
+        ):
+            skipped += len(names)
             continue
-        files.append(path)
-    return sorted(files)
+        record_names[dirpath] = names
+    return record_names, skipped
+
+
+def _journal_is_current(directory: Path, *, count: int) -> bool:
+    try:
+        marker = from_json((directory / _JOURNAL_NAME).read_bytes())
+        mtime_ns = directory.stat().st_mtime_ns
+    except (OSError, ValueError):
+        return False
+    return (
+        isinstance(marker, dict)
+        and marker.get("tool") == _JOURNAL_TOOL
+        and marker.get("count") == count
+        and marker.get("mtime_ns") == mtime_ns
+    )
+
+
+def _write_journal(directory: Path, *, count: int) -> None:
+    """Record `directory` as fully migrated at its current mtime.
+
+    The marker entry is created first (which itself bumps the directory mtime)
+    and then filled in place, so the recorded mtime already accounts for it.
+    A torn write just fails to parse and forces a rescan.
+    """
+
+    marker = directory / _JOURNAL_NAME
+    marker.touch(exist_ok=True)
+    payload = {
+        "mtime_ns": directory.stat().st_mtime_ns,
+        "count": count,
+        "tool": _JOURNAL_TOOL,
+    }
+    marker.write_bytes(to_json(payload))
 
 
 def _detailed_path_for_record(path: Path) -> Path | None:
@@ -125,26 +269,27 @@ def _read_legacy_input_text_from_detailed(path: Path, *, encoding: str) -> str |
     The split store format writes the first detailed line as a JSON string.
     For robustness we also accept a JSON object/array line and treat the raw line
     itself as input text.
+
+    Only the lines up to the first non-empty one are read: the remaining
+    lines hold the (potentially large) serialized model messages.
     """
 
     try:
-        lines = path.read_text(encoding=encoding).splitlines()
+        with path.open(encoding=encoding) as f:
+            line = next((s for raw_line in f if (s := raw_line.strip())), None)
     except OSError:
         return None
+    if line is None:
+        return None
 
-    for raw_line in lines:
-        line = raw_line.strip()
-        if not line:
-            continue
-        try:
-            decoded = json.loads(line)
-        except ValueError:
-            return None
-        if isinstance(decoded, str):
-            return decoded
-        if isinstance(decoded, (dict, list)):
-            return line
+    try:
+        decoded = from_json(line)
+    except ValueError:
         return None
+    if isinstance(decoded, str):
+        return decoded
+    if isinstance(decoded, (dict, list)):
+        return line
     return None
 
 
@@ -173,7 +318,7 @@ def _parse_telegram_updates(input_text: str) -> list[dict[str, Any]]:
         if not line:
             continue
         try:
-            decoded = json.loads(line)
+            decoded = from_json(line)
         except ValueError:
             continue
         if isinstance(decoded, dict):
@@ -185,7 +330,7 @@ def _parse_telegram_updates(input_text: str) -> list[dict[str, Any]]:
     if not stripped:
         return []
     try:
-        decoded = json.loads(stripped)
+        decoded = from_json(stripped)
     except ValueError:
         return []
 
@@ -288,21 +433,6 @@ def _migrate_record_payload(
     return changed, data
 
 
-def _atomic_write_text(*, path: Path, text: str, encoding: str) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile(
-        "w",
-        encoding=encoding,
-        dir=path.parent,
-        prefix=f".{path.name}.",
-        suffix=".tmp",
-        delete=False,
-    ) as tf:
-        tmp_path = Path(tf.name)
-        tf.write(text)
-    tmp_path.replace(path)
-
-
 def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description=(
@@ -320,6 +450,17 @@ def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         default="utf-8",
         help="File encoding (default: utf-8).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes when applying (default: CPU count).",
+    )
+    parser.add_argument(
+        "--rescan",
+        action="store_true",
+        help="Ignore per-directory `.migrated_v1` markers from earlier runs.",
+    )
     parser.add_argument(
         "--apply",
         action="store_true",
@@ -334,22 +475,22 @@ def main(argv: list[str] | None = None) -> int:
         args.root,
         encoding=args.encoding,
         dry_run=not args.apply,
+        max_workers=args.workers,
+        rescan=args.rescan,
     )
 
     mode = "dry-run" if not args.apply else "apply"
-    print(
-        "\n".join(
-            [
-                f"Mode: {mode}",
-                f"Scanned: {report.scanned_files}",
-                f"Changed: {report.changed_files}",
-                f"Unchanged: {report.unchanged_files}",
-                f"Errors: {len(report.errors)}",
-            ]
-        )
-    )
-    for err in report.errors:
-        print(f"- {err}")
+    lines = [
+        f"Mode: {mode}",
+        f"Scanned: {report.scanned_files}",
+        f"Changed: {report.changed_files}",
+        f"Unchanged: {report.unchanged_files}",
+        f"Skipped (journal): {report.skipped_files}",
+        f"Errors: {len(report.errors)}",
+    ]
+    lines.extend(f"- {err}" for err in report.errors)
+    # One write for the whole report; a broken tree can yield many error lines.
+    sys.stdout.write("\n".join(lines) + "\n")
 
     return 1 if report.has_errors else 0
 
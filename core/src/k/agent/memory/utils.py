@@ -1,4 +1,103 @@
-# from k.agent.memory.entities import MemoryRecord
+"""Filesystem helpers shared by the folder-backed memory store and its migrations.
 
-# def print_memory_records(records: list[MemoryRecord]) -> str:
-#     return "\n".join(x.model_dump_json(exclude="detailed") for x in records)
+`atomic_write_bytes` replaces a file atomically (readers see either the old or
+the new content, never a partial write). When the target does not exist yet,
+Linux builds use an anonymous `O_TMPFILE` inode that is linked into place once
+fully written, so no named temp directory entry is ever created. `linkat`
+cannot overwrite, so existing targets (e.g. migration rewrites and parent
+`children` updates) go straight to `NamedTemporaryFile` + `replace`, which is
+the cheaper path for them. Any platform/filesystem/sandbox that rejects
+`O_TMPFILE` or linking via `/proc/self/fd` also uses that portable path, and
+the fast path stays disabled for the rest of the process.
+
+`write_bytes_if_changed` skips the write entirely when the file already holds
+the same bytes; the size from `stat()` is checked first so differing files are
+never read back.
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import tempfile
+from pathlib import Path
+
+# Flipped off on the first environment-level failure so later writes go
+# straight to the portable path instead of paying for a doomed attempt.
+_o_tmpfile_enabled = hasattr(os, "O_TMPFILE")
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Atomically replace `path` with `data`, creating parent directories.
+
+    New files are created with mode 0600, matching `tempfile` semantics.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if (
+        _o_tmpfile_enabled
+        and not os.path.lexists(path)
+        and _write_via_o_tmpfile(path, data)
+    ):
+        return
+
+    with tempfile.NamedTemporaryFile(
+        "wb",
+        dir=path.parent,
+        prefix=f".{path.name}.",
+        suffix=".tmp",
+        delete=False,
+    ) as tf:
+        tmp_path = Path(tf.name)
+        tf.write(data)
+    tmp_path.replace(path)
+
+
+def write_bytes_if_changed(path: Path, data: bytes) -> bool:
+    """Atomically write `data` to `path` unless it already has that content.
+
+    Returns:
+        True if the file was written, false if it was already up to date.
+    """
+
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    atomic_write_bytes(path, data)
+    return True
+
+
+def _write_via_o_tmpfile(path: Path, data: bytes) -> bool:
+    """Try to create `path` via `O_TMPFILE` + `linkat`; return false on failure.
+
+    Only meant for targets that do not exist yet. If one appears concurrently,
+    this returns false (without disabling the fast path) so the caller falls
+    back to the overwriting path.
+    """
+
+    global _o_tmpfile_enabled
+
+    try:
+        fd = os.open(path.parent, os.O_TMPFILE | os.O_WRONLY, 0o600)
+    except OSError as e:
+        if e.errno in (errno.EOPNOTSUPP, errno.EISDIR, errno.EINVAL):
+            _o_tmpfile_enabled = False
+            return False
+        raise
+
+    try:
+        with os.fdopen(fd, "wb", closefd=False) as f:
+            f.write(data)
+        try:
+            os.link(f"/proc/self/fd/{fd}", path)
+        except FileExistsError:
+            return False
+        except OSError:
+            # No `/proc`, cross-device restrictions, or a sandboxed `linkat`.
+            _o_tmpfile_enabled = False
+            return False
+    finally:
+        os.close(fd)
+    return True
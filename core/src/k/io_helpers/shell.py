@@ -16,6 +16,7 @@ from __future__ import annotations
 import asyncio
 import secrets
 import subprocess
+from collections.abc import Iterable
 from contextlib import suppress
 from dataclasses import dataclass, field
 from typing import Literal, Self
@@ -29,6 +30,8 @@ from anyio.abc import (
 from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 
 type NextResult = tuple[bytes, bytes, int | None]
+# A single buffer, or several chunks that are written to stdin in one send.
+type StdinInput = bytes | bytearray | memoryview | Iterable[bytes]
 type StreamName = Literal["stdout", "stderr"]
 
 
@@ -151,14 +154,14 @@ class ShellSessionManager:
     async def next(
         self,
         session_id: str,
-        stdin: bytes | None = None,
+        stdin: StdinInput | None = None,
         timeout_seconds: float | None = None,
     ) -> NextResult:
         """Run the next step for a registered session.
 
         Args:
             session_id: Registered shell session id.
-            stdin: Optional stdin bytes to write before waiting.
+            stdin: Optional stdin bytes (or chunks) to write before waiting.
             timeout_seconds:
                 Optional per-call timeout override (seconds) for this `next()`
                 call only. If omitted, the session default is used.
@@ -263,7 +266,7 @@ class ShellSession:
 
     API:
     - `__init__(command: str, ...)`
-    - `await next(stdin: bytes | None) -> (stdout, stderr, returncode|None)`
+    - `await next(stdin: bytes | Iterable[bytes] | None) -> (stdout, stderr, returncode|None)`
     - `await interrupt()`
 
     `returncode=None` means the subprocess is still running.
@@ -391,12 +394,14 @@ class ShellSession:
                 await self._out_send.send(_StreamDone(stream=stream_name))
 
     async def next(
-        self, stdin: bytes | None = None, timeout_seconds: float | None = None
+        self, stdin: StdinInput | None = None, timeout_seconds: float | None = None
     ) -> NextResult:
         """Send stdin and wait for output or exit.
 
         Args:
-            stdin: Optional stdin bytes to send first.
+            stdin: Optional stdin bytes to send first. An iterable of chunks
+                (e.g. several input lines) is joined and written with a single
+                pipe send instead of one write per chunk.
             timeout_seconds:
                 Optional per-call timeout override in seconds. If omitted, uses
                 `self.options.timeout_seconds`.
@@ -422,7 +427,15 @@ class ShellSession:
         if stdin is not None:
             if self._stdin is None:
                 raise RuntimeError("Process stdin is not available")
-            await self._stdin.send(stdin)
+            # Bytes-like buffers are iterable too (as ints), so only join
+            # genuine iterables of chunks.
+            data = (
+                bytes(stdin)
+                if isinstance(stdin, (bytes, bytearray, memoryview))
+                else b"".join(stdin)
+            )
+            if data:
+                await self._stdin.send(data)
 
         stdout = bytearray()
         stderr = bytearray()
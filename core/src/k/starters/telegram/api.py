@@ -1,95 +1,139 @@
-"""Telegram Bot API client used by the long-poll starter."""
+"""Telegram Bot API client used by the long-poll starter.
+
+All calls share one lazily created `httpx.AsyncClient`, so the long-poll loop
+and outbound sends reuse pooled keep-alive TLS connections instead of paying a
+TCP+TLS handshake per request, and requests are cancellable natively (no worker
+thread hop). Response bodies are parsed from bytes with pydantic-core's
+compiled JSON parser.
+
+`stream_updates()` pipelines long-polling: the next `getUpdates` request is
+issued as soon as a batch arrives, overlapping server long-poll latency with
+the consumer's processing of the previous batch.
+"""
 
 from __future__ import annotations
 
-import json
-import urllib.error
-import urllib.parse
-import urllib.request
-from dataclasses import dataclass
+import logging
+import re
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from typing import Any, Final
 
-import anyio.to_thread as to_thread
+import anyio
+import httpx
+from anyio.streams.memory import MemoryObjectReceiveStream
+from pydantic_core import from_json
 
 _TELEGRAM_API_BASE: Final[str] = "https://api.telegram.org"
+_CONNECT_TIMEOUT_SECONDS: Final[float] = 5.0
+_DEFAULT_TIMEOUT_SECONDS: Final[float] = 10.0
+# Telegram caps `getUpdates` `limit` at 100.
+_GET_UPDATES_LIMIT: Final[int] = 100
+_POLL_BACKOFF_INITIAL_SECONDS: Final[float] = 1.0
+_POLL_BACKOFF_MAX_SECONDS: Final[float] = 30.0
+# `/bot<token>/` path segment of Bot API URLs (see `_method_url`).
+_BOT_TOKEN_IN_URL_RE: Final[re.Pattern[str]] = re.compile(r"/bot[^/\s]+/")
 
 
 class TelegramBotApiError(RuntimeError):
     """Raised when Telegram Bot API returns a non-ok response or invalid JSON."""
 
 
+class _BotTokenRedactingFilter(logging.Filter):
+    """Redact the bot token from log records that contain Bot API URLs.
+
+    httpx logs every request URL at INFO, and those URLs embed the token.
+    Attach this to the handlers that ship logs elsewhere (the CLI does so for
+    its logfire handler) instead of changing global logger levels.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        redacted = _BOT_TOKEN_IN_URL_RE.sub("/bot<redacted>/", message)
+        if redacted != message:
+            record.msg = redacted
+            record.args = None
+        return True
+
+
 @dataclass(slots=True)
 class TelegramBotApi:
-    """Minimal Telegram Bot API client for `getUpdates` polling."""
+    """Minimal Telegram Bot API client for `getUpdates` polling.
+
+    `client` may be injected (e.g. an `httpx.MockTransport`-backed client in
+    tests); otherwise one is created on first use and owned by this instance.
+    The client lives until `aclose()` is called.
+    """
 
     token: str
+    client: httpx.AsyncClient | None = field(default=None, repr=False)
 
     def _method_url(self, method: str) -> str:
         # Never log/print this URL; it embeds the bot token.
         return f"{_TELEGRAM_API_BASE}/bot{self.token}/{method}"
 
-    def _send_message_sync(
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    _DEFAULT_TIMEOUT_SECONDS, connect=_CONNECT_TIMEOUT_SECONDS
+                )
+            )
+        return self.client
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client (safe to call more than once)."""
+
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def _call(
         self,
+        method: str,
         *,
-        chat_id: int,
-        text: str,
-        reply_to_message_id: int | None = None,
-        message_thread_id: int | None = None,
-        parse_mode: str = "HTML",
-    ) -> dict[str, Any]:
-        params: dict[str, Any] = {
-            "chat_id": chat_id,
-            "text": text,
-            "parse_mode": parse_mode,
-        }
-        if reply_to_message_id is not None:
-            params["reply_to_message_id"] = reply_to_message_id
-        if message_thread_id is not None:
-            params["message_thread_id"] = message_thread_id
-
-        data = urllib.parse.urlencode(params).encode("utf-8")
-        request = urllib.request.Request(
-            self._method_url("sendMessage"),
-            data=data,
-            method="POST",
-        )
-        request.add_header("Content-Type", "application/x-www-form-urlencoded")
+        params: dict[str, Any] | None = None,
+        post: bool = False,
+        timeout_seconds: float = _DEFAULT_TIMEOUT_SECONDS,
+    ) -> Any:
+        """Call `method` and return the payload's `result` (unchecked type).
+
+        Raises:
+            TelegramBotApiError: On HTTP/network errors, invalid JSON, or a
+                payload without `"ok": true`.
+        """
 
+        client = self._get_client()
+        url = self._method_url(method)
+        timeout = httpx.Timeout(timeout_seconds, connect=_CONNECT_TIMEOUT_SECONDS)
         try:
-            with urllib.request.urlopen(request, timeout=10) as resp:
-                raw = resp.read()
-        except (
-            urllib.error.HTTPError
-        ) as e:  # pragma: no cover (hard to simulate reliably)
+            if post:
+                resp = await client.post(url, data=params, timeout=timeout)
+            else:
+                resp = await client.get(url, params=params, timeout=timeout)
+        except httpx.HTTPError as e:  # pragma: no cover (network dependent)
+            raise TelegramBotApiError(f"Telegram {method} failed: network error") from e
+
+        if resp.is_error:
             raise TelegramBotApiError(
-                f"Telegram sendMessage failed: HTTP {e.code}"
-            ) from e
-        except urllib.error.URLError as e:  # pragma: no cover (network dependent)
-            raise TelegramBotApiError(
-                "Telegram sendMessage failed: network error"
-            ) from e
+                f"Telegram {method} failed: HTTP {resp.status_code}"
+            )
 
+        # Parse the raw body bytes directly (no separate UTF-8 decode pass).
         try:
-            payload = json.loads(raw.decode("utf-8"))
-        except (UnicodeDecodeError, json.JSONDecodeError) as e:
-            raise TelegramBotApiError(
-                "Telegram sendMessage failed: invalid JSON"
-            ) from e
+            payload = from_json(resp.content)
+        except ValueError as e:
+            raise TelegramBotApiError(f"Telegram {method} failed: invalid JSON") from e
 
         if not isinstance(payload, dict) or payload.get("ok") is not True:
             desc = payload.get("description") if isinstance(payload, dict) else None
             raise TelegramBotApiError(
-                "Telegram sendMessage failed"
+                f"Telegram {method} failed"
                 + (f": {desc}" if isinstance(desc, str) and desc else "")
             )
 
-        result = payload.get("result")
-        if not isinstance(result, dict):
-            raise TelegramBotApiError(
-                "Telegram sendMessage failed: missing result dict"
-            )
-
-        return result
+        return payload.get("result")
 
     async def send_message(
         self,
@@ -99,128 +143,123 @@ class TelegramBotApi:
         reply_to_message_id: int | None = None,
         message_thread_id: int | None = None,
     ) -> dict[str, Any]:
-        """Send a message via `sendMessage` (async wrapper).
+        """Send a message via `sendMessage`.
 
         Uses `parse_mode="HTML"` by default.
         """
 
         # Keep a minimal guard to avoid Telegram rejecting NUL-containing strings.
         safe_text = text.replace("\x00", "\ufffd")
-        return await to_thread.run_sync(
-            lambda: self._send_message_sync(
-                chat_id=chat_id,
-                text=safe_text,
-                reply_to_message_id=reply_to_message_id,
-                message_thread_id=message_thread_id,
-                parse_mode="HTML",
-            )
-        )
-
-    def _get_me_sync(self) -> dict[str, Any]:
-        request = urllib.request.Request(self._method_url("getMe"), method="GET")
-        try:
-            with urllib.request.urlopen(request, timeout=10) as resp:
-                raw = resp.read()
-        except (
-            urllib.error.HTTPError
-        ) as e:  # pragma: no cover (hard to simulate reliably)
-            raise TelegramBotApiError(f"Telegram getMe failed: HTTP {e.code}") from e
-        except urllib.error.URLError as e:  # pragma: no cover (network dependent)
-            raise TelegramBotApiError("Telegram getMe failed: network error") from e
-
-        try:
-            payload = json.loads(raw.decode("utf-8"))
-        except (UnicodeDecodeError, json.JSONDecodeError) as e:
-            raise TelegramBotApiError("Telegram getMe failed: invalid JSON") from e
+        params: dict[str, Any] = {
+            "chat_id": chat_id,
+            "text": safe_text,
+            "parse_mode": "HTML",
+        }
+        if reply_to_message_id is not None:
+            params["reply_to_message_id"] = reply_to_message_id
+        if message_thread_id is not None:
+            params["message_thread_id"] = message_thread_id
 
-        if not isinstance(payload, dict) or payload.get("ok") is not True:
-            desc = payload.get("description") if isinstance(payload, dict) else None
+        result = await self._call("sendMessage", params=params, post=True)
+        if not isinstance(result, dict):
             raise TelegramBotApiError(
-                "Telegram getMe failed"
-                + (f": {desc}" if isinstance(desc, str) and desc else "")
+                "Telegram sendMessage failed: missing result dict"
             )
-
-        result = payload.get("result")
-        if not isinstance(result, dict):
-            raise TelegramBotApiError("Telegram getMe failed: missing result dict")
-
         return result
 
     async def get_me(self) -> dict[str, Any]:
-        """Fetch bot metadata via `getMe` (async wrapper)."""
+        """Fetch bot metadata via `getMe`."""
 
-        return await to_thread.run_sync(self._get_me_sync)
+        result = await self._call("getMe")
+        if not isinstance(result, dict):
+            raise TelegramBotApiError("Telegram getMe failed: missing result dict")
+        return result
 
-    def _get_updates_sync(
+    async def get_updates(
         self,
         *,
         offset: int | None,
         timeout_seconds: int,
     ) -> list[dict[str, Any]]:
+        """Long-poll `getUpdates`."""
+
         params: dict[str, Any] = {
             "timeout": timeout_seconds,
-            # Telegram `getUpdates` `limit` is capped (commonly 100). Use the
-            # maximum to drain pending updates without needing a CLI knob.
-            "limit": 10,
+            # Use the maximum to drain pending updates without needing a CLI knob.
+            "limit": _GET_UPDATES_LIMIT,
         }
         if offset is not None:
             params["offset"] = offset
 
-        url = f"{self._method_url('getUpdates')}?{urllib.parse.urlencode(params)}"
-        request = urllib.request.Request(url, method="GET")
-
         # Client timeout should exceed server long-poll timeout.
         client_timeout = max(5, timeout_seconds + 15)
-        try:
-            with urllib.request.urlopen(request, timeout=client_timeout) as resp:
-                raw = resp.read()
-        except (
-            urllib.error.HTTPError
-        ) as e:  # pragma: no cover (hard to simulate reliably)
-            raise TelegramBotApiError(
-                f"Telegram getUpdates failed: HTTP {e.code}"
-            ) from e
-        except urllib.error.URLError as e:  # pragma: no cover (network dependent)
-            raise TelegramBotApiError(
-                "Telegram getUpdates failed: network error"
-            ) from e
-
-        try:
-            payload = json.loads(raw.decode("utf-8"))
-        except (UnicodeDecodeError, json.JSONDecodeError) as e:
-            raise TelegramBotApiError("Telegram getUpdates failed: invalid JSON") from e
-
-        if not isinstance(payload, dict) or payload.get("ok") is not True:
-            desc = payload.get("description") if isinstance(payload, dict) else None
-            raise TelegramBotApiError(
-                "Telegram getUpdates failed"
-                + (f": {desc}" if isinstance(desc, str) and desc else "")
-            )
-
-        result = payload.get("result")
+        result = await self._call(
+            "getUpdates", params=params, timeout_seconds=client_timeout
+        )
         if not isinstance(result, list):
             raise TelegramBotApiError("Telegram getUpdates failed: missing result list")
 
-        updates: list[dict[str, Any]] = []
-        for item in result:
-            if isinstance(item, dict):
-                updates.append(item)
-        return updates
+        return [item for item in result if isinstance(item, dict)]
 
-    async def get_updates(
+    @asynccontextmanager
+    async def stream_updates(
         self,
         *,
         offset: int | None,
         timeout_seconds: int,
-    ) -> list[dict[str, Any]]:
-        """Long-poll `getUpdates` (async wrapper).
+        on_error: Callable[[TelegramBotApiError], None] | None = None,
+    ) -> AsyncIterator[MemoryObjectReceiveStream[list[dict[str, Any]]]]:
+        """Long-poll forever, keeping one `getUpdates` request ahead of the consumer.
+
+        Yields a receive stream of update batches (possibly empty). A background
+        task requests `offset = max(update_id) + 1` right after each batch is
+        handed over, so at most one batch is waiting while the consumer works.
+
+        Trade-off: a batch is acknowledged to Telegram (by the next offset)
+        before the consumer finishes processing it, so a crash mid-batch may
+        drop it server-side.
 
-        Note: stdlib `urllib` is blocking; this runs the request in a worker
-        thread so the polling loop and agent tasks remain async-friendly.
+        Errors are passed to `on_error` and retried with exponential backoff
+        (1s doubling up to 30s). Leaving the context cancels the poller.
         """
 
-        return await to_thread.run_sync(
-            lambda: self._get_updates_sync(
-                offset=offset, timeout_seconds=timeout_seconds
-            )
-        )
+        send, receive = anyio.create_memory_object_stream[list[dict[str, Any]]]()
+
+        async def poll() -> None:
+            next_offset = offset
+            backoff_seconds = _POLL_BACKOFF_INITIAL_SECONDS
+            async with send:
+                while True:
+                    try:
+                        updates = await self.get_updates(
+                            offset=next_offset, timeout_seconds=timeout_seconds
+                        )
+                    except TelegramBotApiError as e:
+                        if on_error is not None:
+                            on_error(e)
+                        await anyio.sleep(backoff_seconds)
+                        backoff_seconds = min(
+                            backoff_seconds * 2, _POLL_BACKOFF_MAX_SECONDS
+                        )
+                        continue
+
+                    backoff_seconds = _POLL_BACKOFF_INITIAL_SECONDS
+                    update_ids = [
+                        update_id
+                        for update in updates
+                        if isinstance(update_id := update.get("update_id"), int)
+                    ]
+                    if update_ids:
+                        next_offset = max(update_ids) + 1
+                    await send.send(updates)
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(poll)
+            try:
+                yield receive
+            finally:
+                # Cancel before closing: a poller blocked in `send.send()` with
+                # a prefetched batch would otherwise wake with
+                # `BrokenResourceError` and fail the task group on exit.
+                tg.cancel_scope.cancel()
+                receive.close()
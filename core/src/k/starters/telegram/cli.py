@@ -15,11 +15,27 @@ if TYPE_CHECKING:
 
 from k.config import Config
 
+from .api import _BotTokenRedactingFilter
 from .compact import _expand_chat_id_watchlist
 from .runner import _poll_and_run_forever
 from .tz import _DEFAULT_TIMEZONE, _parse_timezone
 
-_ID_SPLIT_RE: Final[re.Pattern[str]] = re.compile(r"[,\s]+")
+_CHAT_ID_RE: Final[re.Pattern[str]] = re.compile(r"[+-]?\d+")
+# Whole `--chat_id` value: ids separated by commas and/or whitespace.
+_CHAT_ID_LIST_RE: Final[re.Pattern[str]] = re.compile(
+    r"[,\s]*[+-]?\d+(?:[,\s]+[+-]?\d+)*[,\s]*"
+)
+
+
+def _parse_chat_ids(raw: str) -> frozenset[int]:
+    """Parse a comma/whitespace separated chat id list.
+
+    Validates the whole string once, then extracts every id in a single pass.
+    """
+
+    if _CHAT_ID_LIST_RE.fullmatch(raw) is None:
+        raise ValueError(f"Invalid chat_id entry in: {raw!r}")
+    return frozenset(map(int, _CHAT_ID_RE.findall(raw)))
 
 
 def _parse_cli_args(argv: list[str] | None = None) -> argparse.Namespace:
@@ -98,7 +114,10 @@ async def run(
 
     logfire.configure()
     logfire.instrument_pydantic_ai()
-    logging.basicConfig(level=logging.INFO, handlers=[logfire.LogfireLoggingHandler()])
+    log_handler = logfire.LogfireLoggingHandler()
+    # httpx logs request URLs at INFO; keep the embedded bot token out of them.
+    log_handler.addFilter(_BotTokenRedactingFilter())
+    logging.basicConfig(level=logging.INFO, handlers=[log_handler])
 
     config = Config()  # type: ignore[call-arg]
 
@@ -107,17 +126,12 @@ async def run(
     except ValueError as e:
         raise ValueError(f"Invalid timezone: {e}") from e
 
-    chat_ids: set[int] | None
+    chat_ids: frozenset[int] | None
     raw_chat_ids = str(chat_id).strip()
     if not raw_chat_ids:
         chat_ids = None
     else:
-        parts = [p for p in _ID_SPLIT_RE.split(raw_chat_ids) if p]
-        try:
-            chat_ids = {int(p) for p in parts}
-        except ValueError as e:
-            raise ValueError(f"Invalid chat_id entry in: {raw_chat_ids!r}") from e
-        chat_ids = _expand_chat_id_watchlist(chat_ids)
+        chat_ids = _expand_chat_id_watchlist(_parse_chat_ids(raw_chat_ids))
 
     store_path: Path | None
     raw_store_path = str(updates_store_path).strip()
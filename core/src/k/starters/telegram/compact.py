@@ -12,6 +12,7 @@ from __future__ import annotations
 import datetime
 import json
 from collections import defaultdict
+from collections.abc import Set as AbstractSet
 from typing import Any, Final
 
 from .tz import _format_unix_seconds
@@ -84,18 +85,18 @@ _FORUM_TOPIC_CREATED_PATHS: Final[tuple[tuple[str, ...], ...]] = (
 )
 
 
-def _expand_chat_id_watchlist(chat_ids: set[int]) -> set[int]:
+def _expand_chat_id_watchlist(chat_ids: AbstractSet[int]) -> frozenset[int]:
     """Expand a chat-id watchlist to be resilient to Telegram supergroup IDs.
 
     Telegram supergroup/channel chat ids are often presented with a `-100...`
     prefix (e.g. `-1001886218691`). It's easy to copy/paste the shorter
     `-1886218691` form from other places. To reduce footguns, expand the
     watchlist to include both forms when the number appears to be a supergroup
-    variant.
+    variant. The result is read-only so it can be shared across poll batches.
     """
 
     expanded: set[int] = set(chat_ids)
-    for chat_id in list(chat_ids):
+    for chat_id in chat_ids:
         if chat_id >= 0:
             continue
 
@@ -106,7 +107,7 @@ def _expand_chat_id_watchlist(chat_ids: set[int]) -> set[int]:
 
         expanded.add(-int(_SUPERGROUP_ID_PREFIX + abs_str))
 
-    return expanded
+    return frozenset(expanded)
 
 
 def _compact_telegram_update(
@@ -695,7 +696,7 @@ def dispatch_groups_for_batch(
     updates: list[dict[str, Any]],
     *,
     keyword: str,
-    chat_ids: set[int] | None,
+    chat_ids: AbstractSet[int] | None,
     bot_user_id: int | None,
     bot_username: str | None,
 ) -> dict[int | None, list[dict[str, Any]]] | None:
@@ -735,7 +736,7 @@ def dispatch_groups_for_batch(
 def group_updates_by_chat_id(
     updates: list[dict[str, Any]],
     *,
-    chat_ids: set[int] | None,
+    chat_ids: AbstractSet[int] | None,
 ) -> dict[int | None, list[dict[str, Any]]]:
     """Group updates by chat id.
 
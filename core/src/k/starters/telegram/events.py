@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import datetime
-import json
 from typing import Any
 
+from pydantic_core import to_json
+
 from k.agent.core import Event
 
 from .compact import _compact_telegram_update, extract_chat_id
@@ -58,11 +59,14 @@ def telegram_updates_to_event(
     share the same chat, so retrieval can include all threads in that chat.
     """
 
-    bodies = [
-        _json_dumps(_compact_telegram_update(update, tz=tz) if compact else update)
-        for update in updates
-    ]
-    return Event(in_channel=_in_channel_for_updates(updates), content="\n".join(bodies))
+    # Join encoded bytes and decode once instead of building one str per update.
+    body = b"\n".join(
+        [
+            _json_bytes(_compact_telegram_update(update, tz=tz) if compact else update)
+            for update in updates
+        ]
+    ).decode("utf-8")
+    return Event(in_channel=_in_channel_for_updates(updates), content=body)
 
 
 def telegram_update_to_event_json(
@@ -71,23 +75,46 @@ def telegram_update_to_event_json(
     compact: bool = True,
     tz: datetime.tzinfo = _DEFAULT_TZINFO,
 ) -> str:
-    """Convert a Telegram update dict into an agent `Event` JSON string."""
+    """Convert a Telegram update dict into an agent `Event` JSON string.
+
+    Encodes directly without building an `Event`: `_in_channel_for_update`
+    only yields valid channel paths (fixed segments plus integer ids) and
+    `out_channel` is always `None`, so `Event` validation would be a no-op.
+    Serializing the three fields in declaration order gives the same bytes as
+    `Event.model_dump_json()`.
+    """
 
-    return telegram_update_to_event(update, compact=compact, tz=tz).model_dump_json()
+    body = _json_dumps(_compact_telegram_update(update, tz=tz) if compact else update)
+    return to_json(
+        {
+            "in_channel": _in_channel_for_update(update),
+            "out_channel": None,
+            "content": body,
+        }
+    ).decode("utf-8")
 
 
 def _json_dumps(obj: Any) -> str:
     """Token-friendly JSON.
 
     Notes:
-    - Keep `ensure_ascii=False` so non-ASCII text doesn't bloat into `\\uXXXX`.
-    - Minify separators to reduce prompt tokens.
-    - Preserve insertion order (do not sort keys) so nested `"chat": {"id": ...}`
-      / `"from": {"id": ...}` can keep `id` as the first key for downstream
-      regex matchers that assume that layout.
+    - Non-ASCII text stays unescaped (no `\\uXXXX` bloat).
+    - Output is minified to reduce prompt tokens.
+    - Insertion order is preserved (keys are not sorted) so nested
+      `"chat": {"id": ...}` / `"from": {"id": ...}` can keep `id` as the first
+      key for downstream regex matchers that assume that layout.
+
+    pydantic-core's compiled `to_json` produces exactly this format, matching
+    `json.dumps(obj, ensure_ascii=False, separators=(",", ":"))`.
     """
 
-    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    return to_json(obj).decode("utf-8")
+
+
+def _json_bytes(obj: Any) -> bytes:
+    """UTF-8 bytes of `_json_dumps(obj)` (skips the decode for joined batches)."""
+
+    return to_json(obj)
 
 
 def _in_channel_for_updates(updates: list[dict[str, Any]]) -> str:
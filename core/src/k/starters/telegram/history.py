@@ -21,6 +21,8 @@ from collections import deque
 from pathlib import Path
 from typing import Any
 
+from pydantic_core import to_json
+
 from .compact import extract_chat_id
 
 _TRIGGER_STATE_VERSION = 1
@@ -38,7 +40,7 @@ def append_updates_jsonl(path: Path, updates: list[dict[str, Any]]) -> int:
 
     Side effects:
     - Creates parent directories for `path`.
-    - Appends to `path` using UTF-8.
+    - Appends to `path` using UTF-8, in a single write for the whole batch.
     """
 
     if not updates:
@@ -46,13 +48,13 @@ def append_updates_jsonl(path: Path, updates: list[dict[str, Any]]) -> int:
 
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    written = 0
-    with path.open("a", encoding="utf-8") as f:
-        for update in updates:
-            f.write(json.dumps(update, ensure_ascii=False, separators=(",", ":")))
-            f.write("\n")
-            written += 1
-    return written
+    # `to_json` emits compact UTF-8 bytes (same as `json.dumps(...,
+    # ensure_ascii=False, separators=(",", ":"))`); each line carries its own
+    # newline so the batch is one buffer and one `write()`.
+    payload = b"".join([to_json(update) + b"\n" for update in updates])
+    with path.open("ab") as f:
+        f.write(payload)
+    return len(updates)
 
 
 def load_recent_updates_grouped_by_chat_id(
@@ -380,7 +380,7 @@ async def _poll_and_run_forever(
     token: str,
     timeout_seconds: int,
     keyword: str,
-    chat_ids: set[int] | None,
+    chat_ids: frozenset[int] | None,
     updates_store_path: Path | None = None,
     dispatch_recent_per_chat: int = 0,
     tz: datetime.tzinfo,
@@ -406,299 +406,309 @@ async def _poll_and_run_forever(
         model = OpenRouterModel(model)
     api = TelegramBotApi(token=token)
     try:
-        me = await api.get_me()
-    except TelegramBotApiError as e:
-        print(f"[yellow]Telegram getMe failed[/yellow]: {e}")
-        me = {}
-
-    bot_user_id = me.get("id") if isinstance(me.get("id"), int) else None
-    bot_username = me.get("username") if isinstance(me.get("username"), str) else None
-
-    last_consumed_update_id: int | None = None
-
-    next_offset: int | None = (
-        last_consumed_update_id + 1 if last_consumed_update_id is not None else None
-    )
-    backoff_seconds = 1.0
-
-    pending_updates_by_id: dict[int, dict[str, Any]] = {}
-    append_lock = anyio.Lock()
-    last_trigger_update_id_by_chat: dict[int, int] = {}
-    trigger_cursor_state_path: Path | None = None
-    if updates_store_path is not None:
-        trigger_cursor_state_path = trigger_cursor_state_path_for_updates_store(
-            updates_store_path
-        )
         try:
-            last_trigger_update_id_by_chat = await to_thread.run_sync(
-                load_last_trigger_update_id_by_chat,
-                trigger_cursor_state_path,
-            )
-        except (OSError, ValueError) as e:
-            print(
-                "[yellow]telegram trigger cursor load error[/yellow] "
-                + f"path={trigger_cursor_state_path}: {type(e).__name__}: {e}"
-            )
-            last_trigger_update_id_by_chat = {}
-
-    print(
-        "\n".join(
-            [
-                "Telegram starter running (polling getUpdates).",
-                f"- model: {model}",
-                f"- timeout_seconds: {timeout_seconds}",
-                f"- last_consumed_update_id: {last_consumed_update_id}",
-                f"- keyword: {keyword!r}",
-                f"- chat_ids: {sorted(chat_ids) if chat_ids is not None else None}",
-                f"- updates_store_path: {updates_store_path}",
-                f"- trigger_cursor_state_path: {trigger_cursor_state_path}",
-                f"- loaded_trigger_cursor_chats: {len(last_trigger_update_id_by_chat)}",
-                f"- dispatch_recent_per_chat: {dispatch_recent_per_chat}",
-                f"- timezone: {tz}",
-                f"- bot_user_id: {bot_user_id}",
-                f"- bot_username: {bot_username}",
-            ]
+            me = await api.get_me()
+        except TelegramBotApiError as e:
+            print(f"[yellow]Telegram getMe failed[/yellow]: {e}")
+            me = {}
+
+        bot_user_id = me.get("id") if isinstance(me.get("id"), int) else None
+        bot_username = (
+            me.get("username") if isinstance(me.get("username"), str) else None
         )
-    )
 
-    async with anyio.create_task_group() as tg:
-        while True:
-            try:
-                updates = await api.get_updates(
-                    offset=next_offset,
-                    timeout_seconds=timeout_seconds,
-                )
-            except TelegramBotApiError as e:
-                print(f"[red]Telegram poll error[/red]: {e}")
-                await anyio.sleep(backoff_seconds)
-                backoff_seconds = min(backoff_seconds * 2, 30.0)
-                continue
+        last_consumed_update_id: int | None = None
 
-            backoff_seconds = 1.0
-            if updates:
-                unseen_updates = filter_unseen_updates(
-                    updates,
-                    last_processed_update_id=last_consumed_update_id,
-                )
-                (
-                    unseen_updates,
-                    ignored_forum_topic_created_updates,
-                ) = filter_non_forum_topic_created_updates(unseen_updates)
-
-                seen_chat_ids = sorted(
-                    {
-                        cid
-                        for update in updates
-                        if (cid := extract_chat_id(update)) is not None
-                    }
-                )
-                chat_ids_preview = seen_chat_ids[:5] + (
-                    ["..."] if len(seen_chat_ids) > 5 else []
+        pending_updates_by_id: dict[int, dict[str, Any]] = {}
+        append_lock = anyio.Lock()
+        last_trigger_update_id_by_chat: dict[int, int] = {}
+        trigger_cursor_state_path: Path | None = None
+        if updates_store_path is not None:
+            trigger_cursor_state_path = trigger_cursor_state_path_for_updates_store(
+                updates_store_path
+            )
+            try:
+                last_trigger_update_id_by_chat = await to_thread.run_sync(
+                    load_last_trigger_update_id_by_chat,
+                    trigger_cursor_state_path,
                 )
+            except (OSError, ValueError) as e:
                 print(
-                    "[cyan]telegram recv[/cyan] "
-                    + f"updates={len(updates)} unseen={len(unseen_updates)} "
-                    + f"forum_topic_created_ignored={ignored_forum_topic_created_updates} "
-                    + f"next_offset={next_offset} chats={chat_ids_preview or None}"
+                    "[yellow]telegram trigger cursor load error[/yellow] "
+                    + f"path={trigger_cursor_state_path}: {type(e).__name__}: {e}"
                 )
+                last_trigger_update_id_by_chat = {}
+
+        print(
+            "\n".join(
+                [
+                    "Telegram starter running (polling getUpdates).",
+                    f"- model: {model}",
+                    f"- timeout_seconds: {timeout_seconds}",
+                    f"- last_consumed_update_id: {last_consumed_update_id}",
+                    f"- keyword: {keyword!r}",
+                    f"- chat_ids: {sorted(chat_ids) if chat_ids is not None else None}",
+                    f"- updates_store_path: {updates_store_path}",
+                    f"- trigger_cursor_state_path: {trigger_cursor_state_path}",
+                    f"- loaded_trigger_cursor_chats: {len(last_trigger_update_id_by_chat)}",
+                    f"- dispatch_recent_per_chat: {dispatch_recent_per_chat}",
+                    f"- timezone: {tz}",
+                    f"- bot_user_id: {bot_user_id}",
+                    f"- bot_username: {bot_username}",
+                ]
+            )
+        )
 
-                latest_observed_update_id = last_consumed_update_id
-                accepted = 0
-                watched = 0
-                accepted_updates: list[dict[str, Any]] = []
-                for update in unseen_updates:
-                    update_id = extract_update_id(update)
-                    if update_id is None:
-                        continue
-
-                    pending_updates_by_id.setdefault(update_id, update)
-                    accepted_updates.append(update)
-                    accepted += 1
-                    if chat_ids is not None:
-                        update_chat_id = extract_chat_id(update)
-                        if update_chat_id is not None and update_chat_id in chat_ids:
-                            watched += 1
-                    if (
-                        latest_observed_update_id is None
-                        or update_id > latest_observed_update_id
-                    ):
-                        latest_observed_update_id = update_id
-                if latest_observed_update_id is not None:
-                    last_consumed_update_id = latest_observed_update_id
-                    next_offset = last_consumed_update_id + 1
-                persisted = 0
-                if updates_store_path is not None and accepted_updates:
-                    try:
-                        persisted = await to_thread.run_sync(
-                            append_updates_jsonl,
-                            updates_store_path,
-                            list(accepted_updates),
-                        )
-                    except OSError as e:
-                        print(
-                            "[yellow]telegram persist error[/yellow] "
-                            + f"path={updates_store_path}: {type(e).__name__}: {e}"
-                        )
-                if accepted:
+        def print_poll_error(e: TelegramBotApiError) -> None:
+            print(f"[red]Telegram poll error[/red]: {e}")
+
+        async with (
+            anyio.create_task_group() as tg,
+            api.stream_updates(
+                # Start from Telegram's oldest unconfirmed update; the stream
+                # advances the offset itself from here on.
+                offset=None,
+                timeout_seconds=timeout_seconds,
+                on_error=print_poll_error,
+            ) as update_batches,
+        ):
+            # The stream keeps the next getUpdates request in flight while this
+            # loop processes the current batch (and handles poll error backoff).
+            async for updates in update_batches:
+                if updates:
+                    unseen_updates = filter_unseen_updates(
+                        updates,
+                        last_processed_update_id=last_consumed_update_id,
+                    )
+                    (
+                        unseen_updates,
+                        ignored_forum_topic_created_updates,
+                    ) = filter_non_forum_topic_created_updates(unseen_updates)
+
+                    seen_chat_ids = sorted(
+                        {
+                            cid
+                            for update in updates
+                            if (cid := extract_chat_id(update)) is not None
+                        }
+                    )
+                    chat_ids_preview = seen_chat_ids[:5] + (
+                        ["..."] if len(seen_chat_ids) > 5 else []
+                    )
                     print(
-                        "[cyan]telegram pending[/cyan] "
-                        + f"accepted={accepted} persisted={persisted if updates_store_path is not None else None} "
-                        + f"watched={watched if chat_ids is not None else None} pending={len(pending_updates_by_id)}"
+                        "[cyan]telegram recv[/cyan] "
+                        + f"updates={len(updates)} unseen={len(unseen_updates)} "
+                        + f"forum_topic_created_ignored={ignored_forum_topic_created_updates} "
+                        + f"chats={chat_ids_preview or None}"
                     )
 
-            if not pending_updates_by_id:
-                continue
+                    latest_observed_update_id = last_consumed_update_id
+                    accepted = 0
+                    watched = 0
+                    accepted_updates: list[dict[str, Any]] = []
+                    for update in unseen_updates:
+                        update_id = extract_update_id(update)
+                        if update_id is None:
+                            continue
+
+                        pending_updates_by_id.setdefault(update_id, update)
+                        accepted_updates.append(update)
+                        accepted += 1
+                        if chat_ids is not None:
+                            update_chat_id = extract_chat_id(update)
+                            if (
+                                update_chat_id is not None
+                                and update_chat_id in chat_ids
+                            ):
+                                watched += 1
+                        if (
+                            latest_observed_update_id is None
+                            or update_id > latest_observed_update_id
+                        ):
+                            latest_observed_update_id = update_id
+                    if latest_observed_update_id is not None:
+                        last_consumed_update_id = latest_observed_update_id
+                    persisted = 0
+                    # Trade-off: `stream_updates` already requested the next
+                    # offset, so Telegram treats this batch as acknowledged
+                    # before it is stored here. A crash before this append
+                    # loses the batch (see `TelegramBotApi.stream_updates`).
+                    if updates_store_path is not None and accepted_updates:
+                        try:
+                            persisted = await to_thread.run_sync(
+                                append_updates_jsonl,
+                                updates_store_path,
+                                list(accepted_updates),
+                            )
+                        except OSError as e:
+                            print(
+                                "[yellow]telegram persist error[/yellow] "
+                                + f"path={updates_store_path}: {type(e).__name__}: {e}"
+                            )
+                    if accepted:
+                        print(
+                            "[cyan]telegram pending[/cyan] "
+                            + f"accepted={accepted} persisted={persisted if updates_store_path is not None else None} "
+                            + f"watched={watched if chat_ids is not None else None} pending={len(pending_updates_by_id)}"
+                        )
 
-            pending_updates_in_order = [
-                pending_updates_by_id[update_id]
-                for update_id in sorted(pending_updates_by_id)
-            ]
-
-            grouped = dispatch_groups_for_batch(
-                pending_updates_in_order,
-                keyword=keyword,
-                chat_ids=chat_ids,
-                bot_user_id=bot_user_id,
-                bot_username=bot_username,
-            )
-            if not grouped:
-                continue
+                if not pending_updates_by_id:
+                    continue
 
-            # If chat_ids is provided, treat it as an exclusive filter for dispatching
-            # to avoid duplicate processing in multi-instance setups.
-            if chat_ids is not None:
-                dispatch_groups = {
-                    cid: updates for cid, updates in grouped.items() if cid in chat_ids
-                }
-            else:
-                dispatch_groups = grouped
-
-            if not dispatch_groups:
-                # Trigger condition matched but no updates from watched chats to dispatch.
-                # Clear pending to avoid re-evaluating the same batch.
-                pending_updates_by_id.clear()
-                continue
+                pending_updates_in_order = [
+                    pending_updates_by_id[update_id]
+                    for update_id in sorted(pending_updates_by_id)
+                ]
 
-            dispatch_source = "pending"
-            replaced_groups = 0
-            if updates_store_path is not None and dispatch_recent_per_chat > 0:
-                try:
-                    recent_groups = await to_thread.run_sync(
-                        partial(
-                            load_recent_updates_grouped_by_chat_id,
-                            updates_store_path,
-                            per_chat_limit=dispatch_recent_per_chat,
-                        )
-                    )
-                except (OSError, ValueError) as e:
-                    print(
-                        "[yellow]telegram recent load error[/yellow] "
-                        + f"path={updates_store_path}: {type(e).__name__}: {e}"
-                    )
+                grouped = dispatch_groups_for_batch(
+                    pending_updates_in_order,
+                    keyword=keyword,
+                    chat_ids=chat_ids,
+                    bot_user_id=bot_user_id,
+                    bot_username=bot_username,
+                )
+                if not grouped:
+                    continue
+
+                # If chat_ids is provided, treat it as an exclusive filter for dispatching
+                # to avoid duplicate processing in multi-instance setups.
+                if chat_ids is not None:
+                    dispatch_groups = {
+                        cid: updates
+                        for cid, updates in grouped.items()
+                        if cid in chat_ids
+                    }
                 else:
-                    dispatch_groups, replaced_groups = (
-                        overlay_dispatch_groups_with_recent(
-                            grouped,
-                            recent_groups=recent_groups,
+                    dispatch_groups = grouped
+
+                if not dispatch_groups:
+                    # Trigger condition matched but no updates from watched chats to dispatch.
+                    # Clear pending to avoid re-evaluating the same batch.
+                    pending_updates_by_id.clear()
+                    continue
+
+                dispatch_source = "pending"
+                replaced_groups = 0
+                if updates_store_path is not None and dispatch_recent_per_chat > 0:
+                    try:
+                        recent_groups = await to_thread.run_sync(
+                            partial(
+                                load_recent_updates_grouped_by_chat_id,
+                                updates_store_path,
+                                per_chat_limit=dispatch_recent_per_chat,
+                            )
                         )
-                    )
-                    if replaced_groups:
-                        dispatch_source = "stored_recent"
-
-            cursor_dropped_updates = 0
-            cursor_dropped_groups = 0
-            forum_topic_created_dropped_updates = 0
-            forum_topic_created_dropped_groups = 0
-            (
-                dispatch_groups,
-                forum_topic_created_dropped_updates,
-                forum_topic_created_dropped_groups,
-            ) = filter_dispatch_groups_without_forum_topic_created_updates(
-                dispatch_groups
-            )
-            if forum_topic_created_dropped_updates:
-                dispatch_source += "+forum_topic_created"
+                    except (OSError, ValueError) as e:
+                        print(
+                            "[yellow]telegram recent load error[/yellow] "
+                            + f"path={updates_store_path}: {type(e).__name__}: {e}"
+                        )
+                    else:
+                        dispatch_groups, replaced_groups = (
+                            overlay_dispatch_groups_with_recent(
+                                grouped,
+                                recent_groups=recent_groups,
+                            )
+                        )
+                        if replaced_groups:
+                            dispatch_source = "stored_recent"
 
-            dispatch_groups, cursor_dropped_updates, cursor_dropped_groups = (
-                filter_dispatch_groups_after_last_trigger(
+                cursor_dropped_updates = 0
+                cursor_dropped_groups = 0
+                forum_topic_created_dropped_updates = 0
+                forum_topic_created_dropped_groups = 0
+                (
                     dispatch_groups,
-                    last_trigger_update_id_by_chat=last_trigger_update_id_by_chat,
+                    forum_topic_created_dropped_updates,
+                    forum_topic_created_dropped_groups,
+                ) = filter_dispatch_groups_without_forum_topic_created_updates(
+                    dispatch_groups
                 )
-            )
-            if cursor_dropped_updates:
-                dispatch_source += "+cursor"
-
-            flags = trigger_flags_for_updates(
-                pending_updates_in_order,
-                keyword=keyword,
-                bot_user_id=bot_user_id,
-                bot_username=bot_username,
-            )
-            reasons = ",".join([k for k, v in flags.items() if v]) or "unknown"
-            print(
-                "[green]telegram trigger[/green] "
-                + f"pending={len(pending_updates_in_order)} groups={len(dispatch_groups)} "
-                + f"source={dispatch_source} replaced_groups={replaced_groups} "
-                + "forum_topic_created_dropped_updates="
-                + f"{forum_topic_created_dropped_updates} "
-                + "forum_topic_created_dropped_groups="
-                + f"{forum_topic_created_dropped_groups} "
-                + f"cursor_dropped_updates={cursor_dropped_updates} cursor_dropped_groups={cursor_dropped_groups} "
-                + f"reasons={reasons}"
-            )
+                if forum_topic_created_dropped_updates:
+                    dispatch_source += "+forum_topic_created"
 
-            if not dispatch_groups:
-                print(
-                    "[green]telegram dispatch[/green] "
-                    + "skipped: no updates newer than last trigger cursor"
+                dispatch_groups, cursor_dropped_updates, cursor_dropped_groups = (
+                    filter_dispatch_groups_after_last_trigger(
+                        dispatch_groups,
+                        last_trigger_update_id_by_chat=last_trigger_update_id_by_chat,
+                    )
                 )
-                # Trigger condition already matched, so clear pending to avoid
-                # repeatedly re-evaluating the same pre-cursor updates.
-                pending_updates_by_id.clear()
-                continue
-
-            for cid, updates_for_chat in dispatch_groups.items():
-                ids = [
-                    uid
-                    for update in updates_for_chat
-                    if (uid := extract_update_id(update)) is not None
-                ]
-                id_span = f"{min(ids)}..{max(ids)}" if ids else "?"
-                prefix = f"[chat_id={cid}]" if cid is not None else "[chat_id=?]"
+                if cursor_dropped_updates:
+                    dispatch_source += "+cursor"
+
+                flags = trigger_flags_for_updates(
+                    pending_updates_in_order,
+                    keyword=keyword,
+                    bot_user_id=bot_user_id,
+                    bot_username=bot_username,
+                )
+                reasons = ",".join([k for k, v in flags.items() if v]) or "unknown"
                 print(
-                    "[green]telegram dispatch[/green] "
-                    + f"{prefix} updates={len(updates_for_chat)} update_id={id_span}"
+                    "[green]telegram trigger[/green] "
+                    + f"pending={len(pending_updates_in_order)} groups={len(dispatch_groups)} "
+                    + f"source={dispatch_source} replaced_groups={replaced_groups} "
+                    + "forum_topic_created_dropped_updates="
+                    + f"{forum_topic_created_dropped_updates} "
+                    + "forum_topic_created_dropped_groups="
+                    + f"{forum_topic_created_dropped_groups} "
+                    + f"cursor_dropped_updates={cursor_dropped_updates} cursor_dropped_groups={cursor_dropped_groups} "
+                    + f"reasons={reasons}"
                 )
 
-            # Clear pending only when dispatching a triggered batch.
-            pending_updates_by_id.clear()
-
-            updated_cursor_chats = update_last_trigger_update_id_by_chat(
-                last_trigger_update_id_by_chat,
-                dispatched_groups=dispatch_groups,
-            )
-            if updated_cursor_chats and trigger_cursor_state_path is not None:
-                try:
-                    await to_thread.run_sync(
-                        save_last_trigger_update_id_by_chat,
-                        trigger_cursor_state_path,
-                        dict(last_trigger_update_id_by_chat),
+                if not dispatch_groups:
+                    print(
+                        "[green]telegram dispatch[/green] "
+                        + "skipped: no updates newer than last trigger cursor"
                     )
-                except (OSError, ValueError) as e:
+                    # Trigger condition already matched, so clear pending to avoid
+                    # repeatedly re-evaluating the same pre-cursor updates.
+                    pending_updates_by_id.clear()
+                    continue
+
+                for cid, updates_for_chat in dispatch_groups.items():
+                    ids = [
+                        uid
+                        for update in updates_for_chat
+                        if (uid := extract_update_id(update)) is not None
+                    ]
+                    id_span = f"{min(ids)}..{max(ids)}" if ids else "?"
+                    prefix = f"[chat_id={cid}]" if cid is not None else "[chat_id=?]"
                     print(
-                        "[yellow]telegram trigger cursor save error[/yellow] "
-                        + f"path={trigger_cursor_state_path}: {type(e).__name__}: {e}"
+                        "[green]telegram dispatch[/green] "
+                        + f"{prefix} updates={len(updates_for_chat)} update_id={id_span}"
                     )
 
-            for cid, updates_for_chat in dispatch_groups.items():
-                tg.start_soon(
-                    run_agent_for_chat_batch,
-                    api,
-                    cid,
-                    list(updates_for_chat),
-                    model,
-                    config,
-                    mem_store,
-                    append_lock,
-                    tz,
+                # Clear pending only when dispatching a triggered batch.
+                pending_updates_by_id.clear()
+
+                updated_cursor_chats = update_last_trigger_update_id_by_chat(
+                    last_trigger_update_id_by_chat,
+                    dispatched_groups=dispatch_groups,
                 )
+                if updated_cursor_chats and trigger_cursor_state_path is not None:
+                    try:
+                        await to_thread.run_sync(
+                            save_last_trigger_update_id_by_chat,
+                            trigger_cursor_state_path,
+                            dict(last_trigger_update_id_by_chat),
+                        )
+                    except (OSError, ValueError) as e:
+                        print(
+                            "[yellow]telegram trigger cursor save error[/yellow] "
+                            + f"path={trigger_cursor_state_path}: {type(e).__name__}: {e}"
+                        )
+
+                for cid, updates_for_chat in dispatch_groups.items():
+                    tg.start_soon(
+                        run_agent_for_chat_batch,
+                        api,
+                        cid,
+                        list(updates_for_chat),
+                        model,
+                        config,
+                        mem_store,
+                        append_lock,
+                        tz,
+                    )
+    finally:
+        await api.aclose()
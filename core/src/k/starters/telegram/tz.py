@@ -3,11 +3,15 @@
 Telegram's `date` fields are unix seconds (UTC). The starter renders these as
 ISO-8601 datetime strings in a configurable timezone, while preserving the
 original seconds as `date_unix` for exact comparisons.
+
+`_parse_timezone` is memoized (bounded LRU): callers may resolve the same
+timezone string repeatedly, and the returned tzinfo objects are immutable.
 """
 
 from __future__ import annotations
 
 import datetime
+import functools
 import re
 from typing import Final
 from zoneinfo import ZoneInfo
@@ -15,7 +19,13 @@ from zoneinfo import ZoneInfo
 _DEFAULT_TIMEZONE: Final[str] = "UTC+8"
 _DEFAULT_TZINFO: Final[datetime.tzinfo] = datetime.timezone(datetime.timedelta(hours=8))
 
+_OFFSET_RE: Final[re.Pattern[str]] = re.compile(
+    r"(?:(?:UTC)?\s*)?([+-])\s*(\d{1,2})(?::?(\d{2}))?\s*",
+    flags=re.IGNORECASE,
+)
+
 
+@functools.lru_cache(maxsize=64)
 def _parse_timezone(value: str) -> datetime.tzinfo:
     """Parse a timezone argument into a tzinfo.
 
@@ -33,11 +43,7 @@ def _parse_timezone(value: str) -> datetime.tzinfo:
     if upper in {"UTC", "Z"}:
         return datetime.UTC
 
-    m = re.fullmatch(
-        r"(?:(?:UTC)?\s*)?([+-])\s*(\d{1,2})(?::?(\d{2}))?\s*",
-        raw,
-        flags=re.IGNORECASE,
-    )
+    m = _OFFSET_RE.fullmatch(raw)
     if m is not None:
         sign_s, hours_s, minutes_s = m.groups()
         hours = int(hours_s)
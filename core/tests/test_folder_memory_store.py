@@ -4,9 +4,11 @@ import json
 from datetime import datetime
 
 import pytest
+from pydantic_ai.messages import ModelResponse, ToolCallPart
 
+from k.agent.memory import folder
 from k.agent.memory.entities import MemoryRecord
-from k.agent.memory.folder import FolderMemoryStore
+from k.agent.memory.folder import FolderMemoryStore, _read_record_header
 
 
 def test_folder_store_get_latest_and_get_by_id(tmp_path) -> None:
@@ -128,6 +130,63 @@ def test_folder_store_get_parents_children_and_ancestors(tmp_path) -> None:
     assert store.get_ancestors(missing, level=2) == [child.id_, parent.id_]
 
 
+def test_folder_store_get_ancestors_dedupes_shared_parents(tmp_path) -> None:
+    store = FolderMemoryStore(tmp_path / "mem")
+
+    def make(hour: int, parents: list[str]) -> MemoryRecord:
+        record = MemoryRecord(
+            in_channel="test",
+            input=f"i{hour}",
+            output=f"o{hour}",
+            detailed=[],
+            created_at=datetime(2026, 1, 1, hour, 0, 0),
+            parents=parents,
+        )
+        store.append(record)
+        return record
+
+    root = make(0, [])
+    left = make(1, [root.id_])
+    right = make(2, [root.id_])
+    tip = make(3, [left.id_, right.id_])
+
+    assert store.get_ancestors(tip) == [left.id_, right.id_, root.id_]
+    assert store.get_ancestors(tip, level=1) == [left.id_, right.id_]
+    assert store.get_ancestors(tip, strict=True) == [left.id_, right.id_, root.id_]
+    assert store.get_ancestor_depths(tip) == {left.id_: 1, right.id_: 1, root.id_: 2}
+
+
+def test_folder_store_append_keeps_loaded_parent_detailed_file(tmp_path) -> None:
+    root = tmp_path / "mem"
+    parent = MemoryRecord(
+        in_channel="test",
+        input="i1",
+        output="o1",
+        detailed=[ModelResponse(parts=[ToolCallPart("bash", {"cmd": "ls"})])],
+        created_at=datetime(2026, 1, 1, 0, 0, 0),
+    )
+    FolderMemoryStore(root).append(parent)
+    detailed_path = next(root.rglob("*.detailed.jsonl"))
+    before = detailed_path.read_bytes()
+    assert b'"tool_name":"bash"' in before
+
+    # A fresh store loads the parent with `detailed=[]`; appending a child
+    # must only touch the parent's core file.
+    store = FolderMemoryStore(root)
+    child = MemoryRecord(
+        in_channel="test",
+        input="i2",
+        output="o2",
+        detailed=[],
+        created_at=datetime(2026, 1, 1, 1, 0, 0),
+        parents=[parent.id_],
+    )
+    store.append(child)
+
+    assert detailed_path.read_bytes() == before
+    assert FolderMemoryStore(root).get_children(parent.id_) == [child.id_]
+
+
 def test_folder_store_get_between(tmp_path) -> None:
     root = tmp_path / "mem"
     store = FolderMemoryStore(root)
@@ -222,3 +281,137 @@ def test_folder_store_rebuild_order_ignores_detailed_files(tmp_path) -> None:
     rebuilt = FolderMemoryStore(root)
     assert rebuilt.get_latest() == r1.id_
     assert rebuilt.get_by_id(r1.id_) == r1
+
+
+def test_folder_store_rejects_invalid_ids_in_core_file(tmp_path) -> None:
+    root = tmp_path / "mem"
+    store = FolderMemoryStore(root)
+
+    r1 = MemoryRecord(
+        in_channel="test",
+        input="i1",
+        compacted=["c1"],
+        output="o1",
+        detailed=[],
+        created_at=datetime(2026, 1, 1, 0, 0, 0),
+    )
+    store.append(r1)
+
+    # Core files are validated on load even though the final record is built
+    # without a second validation pass.
+    core_path = root / "records" / "2026" / "01" / "01" / "00" / f"{r1.id_}.core.json"
+    payload = json.loads(core_path.read_text(encoding="utf-8"))
+    payload["parents"] = ["not-a-uuid"]
+    core_path.write_text(json.dumps(payload), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="Invalid MemoryRecord parents id"):
+        FolderMemoryStore(root).get_latest()
+
+
+def test_folder_store_round_trips_unicode_line_separators(tmp_path) -> None:
+    root = tmp_path / "mem"
+    store = FolderMemoryStore(root)
+
+    # Detailed JSONL keeps non-ASCII unescaped, so U+2028/U+2029 land raw in
+    # the file and must not be treated as line breaks on reload.
+    r1 = MemoryRecord(
+        in_channel="test",
+        input="line\u2028sep",
+        compacted=[],
+        output="para\u2029sep\r",
+        detailed=[],
+        created_at=datetime(2026, 1, 1, 0, 0, 0),
+    )
+    store.append(r1)
+
+    loaded = FolderMemoryStore(root).get_by_id(r1.id_)
+    assert loaded is not None
+    assert loaded.input == r1.input
+    assert loaded.output == r1.output
+
+
+def test_folder_store_rejects_malformed_tool_calls_in_detailed_file(tmp_path) -> None:
+    root = tmp_path / "mem"
+    store = FolderMemoryStore(root)
+
+    r1 = MemoryRecord(
+        in_channel="test",
+        input="i1",
+        compacted=[],
+        output="o1",
+        detailed=[],
+        created_at=datetime(2026, 1, 1, 0, 0, 0),
+    )
+    store.append(r1)
+
+    detailed_path = (
+        root / "records" / "2026" / "01" / "01" / "00" / f"{r1.id_}.detailed.jsonl"
+    )
+    with detailed_path.open("a", encoding="utf-8") as f:
+        f.write('[{"tool_name":"bash","args":{"cmd":"ls"}},{"tool_name":""}]\n')
+
+    with pytest.raises(ValueError, match=r"tool_calls\[1\] must be an object"):
+        FolderMemoryStore(root).get_by_id(r1.id_)
+
+
+def test_read_record_header_uses_filename_id_and_leading_created_at(
+    tmp_path,
+) -> None:
+    path = tmp_path / "-AbCdEfG.core.json"
+    # Only the leading bytes are parsed; the (invalid) tail is never touched.
+    path.write_text(
+        '{"created_at":"2026-01-01T00:00:00","in_channel":"test",'
+        + '"id_":"-AbCdEfG","compacted":["'
+        + "x" * 1024
+        + "\\u12",
+        encoding="utf-8",
+    )
+
+    assert _read_record_header(path, encoding="utf-8") == (
+        "-AbCdEfG",
+        datetime(2026, 1, 1, 0, 0, 0),
+    )
+
+
+def test_read_record_header_prefers_content_id_over_filename(tmp_path) -> None:
+    path = tmp_path / "-AbCdEfG.core.json"
+    path.write_text(
+        '{"created_at":"2026-01-01T00:00:00","in_channel":"test",'
+        + '"id_":"-ZyXwVuT","compacted":[]}',
+        encoding="utf-8",
+    )
+
+    assert _read_record_header(path, encoding="utf-8") == (
+        "-ZyXwVuT",
+        datetime(2026, 1, 1, 0, 0, 0),
+    )
+
+
+def test_folder_store_rebuild_order_reads_headers_in_parallel(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(folder, "_REBUILD_PARALLEL_MIN_FILES", 1)
+    root = tmp_path / "mem"
+    store = FolderMemoryStore(root)
+    records = [
+        MemoryRecord(
+            in_channel="test",
+            input=f"i{hour}",
+            compacted=[],
+            output="o",
+            detailed=[],
+            created_at=datetime(2026, 1, 1, hour, 0, 0),
+        )
+        for hour in (2, 0, 1)
+    ]
+    for record in records:
+        store.append(record)
+
+    (root / "order.jsonl").unlink()
+
+    rebuilt = FolderMemoryStore(root)
+    by_time = sorted(records, key=lambda r: r.created_at)
+    assert rebuilt.get_between(datetime(2026, 1, 1), datetime(2026, 1, 2)) == [
+        r.id_ for r in by_time
+    ]
+    assert rebuilt.get_latest() == by_time[-1].id_
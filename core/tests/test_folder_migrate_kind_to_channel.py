@@ -6,6 +6,7 @@ from pathlib import Path
 
 import pytest
 
+from k.agent.memory import folder_migrate_kind_to_channel
 from k.agent.memory.entities import memory_record_id_from_created_at
 from k.agent.memory.folder import FolderMemoryStore
 from k.agent.memory.folder_migrate_kind_to_channel import (
@@ -110,7 +111,54 @@ def test_folder_store_requires_migration_then_loads_after_apply(tmp_path: Path)
 
     rerun = migrate_folder_memory_kind_to_channel(root, dry_run=False)
     assert rerun.changed_files == 0
-    assert rerun.unchanged_files == 1
+    assert rerun.scanned_files == 0
+    assert rerun.skipped_files == 1
+
+    rescan = migrate_folder_memory_kind_to_channel(root, dry_run=False, rescan=True)
+    assert rescan.changed_files == 0
+    assert rescan.unchanged_files == 1
+
+
+def test_migration_journal_is_invalidated_by_new_record_files(
+    tmp_path: Path,
+) -> None:
+    root = tmp_path / "memories"
+    _record_id, record_path = _write_record_files_with_legacy_kind(
+        root=root,
+        created_at=datetime(2026, 1, 1, 0, 0, tzinfo=UTC),
+        kind="test",
+    )
+    migrate_folder_memory_kind_to_channel(root, dry_run=False)
+    assert (record_path.parent / ".migrated_v1").exists()
+
+    # Same hour directory, so the earlier marker no longer matches.
+    _write_record_files_with_legacy_kind(
+        root=root,
+        created_at=datetime(2026, 1, 1, 0, 30, tzinfo=UTC),
+        kind="test",
+    )
+    report = migrate_folder_memory_kind_to_channel(root, dry_run=True)
+    assert report.skipped_files == 0
+    assert report.scanned_files == 2
+    assert report.changed_files == 1
+
+
+def test_migration_reports_unwritable_journal_marker(tmp_path: Path) -> None:
+    root = tmp_path / "memories"
+    _record_id, record_path = _write_record_files_with_legacy_kind(
+        root=root,
+        created_at=datetime(2026, 1, 1, 0, 0, tzinfo=UTC),
+        kind="test",
+    )
+    # A directory in the marker's place makes the marker write fail.
+    (record_path.parent / ".migrated_v1").mkdir()
+
+    report = migrate_folder_memory_kind_to_channel(root, dry_run=False)
+
+    assert report.changed_files == 1
+    assert len(report.errors) == 1
+    assert ".migrated_v1: journal write failed: IsADirectoryError" in report.errors[0]
+    FolderMemoryStore(root).refresh()
 
 
 def test_migration_infers_telegram_chat_id_from_detailed_input(tmp_path: Path) -> None:
@@ -134,3 +182,56 @@ def test_migration_infers_telegram_chat_id_from_detailed_input(tmp_path: Path) -
     migrated = json.loads(record_path.read_text(encoding="utf-8"))
     assert migrated["in_channel"] == "telegram/chat/567113516"
     assert migrated["out_channel"] is None
+
+
+def test_migration_apply_with_process_pool_merges_chunk_reports(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    root = tmp_path / "memories"
+    record_paths = [
+        _write_record_files_with_legacy_kind(
+            root=root,
+            created_at=datetime(2026, 1, 1, hour, 0, tzinfo=UTC),
+            kind="test",
+        )[1]
+        for hour in range(3)
+    ]
+    # One file per chunk forces the multi-chunk (process pool) path.
+    monkeypatch.setattr(folder_migrate_kind_to_channel, "_CHUNK_SIZE", 1)
+
+    report = migrate_folder_memory_kind_to_channel(root, dry_run=False, max_workers=2)
+
+    assert report.scanned_files == 3
+    assert report.changed_files == 3
+    assert report.errors == []
+    for record_path in record_paths:
+        migrated = json.loads(record_path.read_text(encoding="utf-8"))
+        assert migrated["in_channel"] == "test"
+        assert "kind" not in migrated
+
+
+def test_legacy_input_read_stops_at_first_non_empty_line(tmp_path: Path) -> None:
+    detailed_path = tmp_path / "x.detailed.jsonl"
+    detailed_path.write_text(
+        '\n  \n"raw input"\n{"kind": "request", "parts": [\n', encoding="utf-8"
+    )
+
+    read = folder_migrate_kind_to_channel._read_legacy_input_text_from_detailed
+    assert read(detailed_path, encoding="utf-8") == "raw input"
+
+
+def test_migration_main_prints_report_with_errors(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    root = tmp_path / "memories"
+    bad_path = root / "records" / "2026" / "01" / "01" / "00" / "--------.core.json"
+    bad_path.parent.mkdir(parents=True)
+    bad_path.write_text("[]", encoding="utf-8")
+
+    exit_code = folder_migrate_kind_to_channel.main(["--root", str(root)])
+
+    assert exit_code == 1
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == "Mode: dry-run"
+    assert "Errors: 1" in out
+    assert out[-1].startswith(f"- {bad_path}: ValueError: Expected JSON object")
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from k.agent.memory import utils
+from k.agent.memory.utils import atomic_write_bytes, write_bytes_if_changed
+
+
+@pytest.mark.parametrize("o_tmpfile_enabled", [True, False])
+def test_atomic_write_bytes_creates_and_replaces(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, o_tmpfile_enabled: bool
+) -> None:
+    monkeypatch.setattr(utils, "_o_tmpfile_enabled", o_tmpfile_enabled)
+    path = tmp_path / "a" / "b" / "record.core.json"
+
+    atomic_write_bytes(path, b"first")
+    assert path.read_bytes() == b"first"
+
+    atomic_write_bytes(path, b"second")
+    assert path.read_bytes() == b"second"
+
+    # No temp files are left behind on either path.
+    assert [p.name for p in path.parent.iterdir()] == ["record.core.json"]
+
+
+def test_write_bytes_if_changed_skips_identical_content(tmp_path: Path) -> None:
+    path = tmp_path / "record.detailed.jsonl"
+
+    assert write_bytes_if_changed(path, b"abc") is True
+    mtime_ns = path.stat().st_mtime_ns
+
+    assert write_bytes_if_changed(path, b"abc") is False
+    assert path.stat().st_mtime_ns == mtime_ns
+
+    # Same size, different content still rewrites.
+    assert write_bytes_if_changed(path, b"abd") is True
+    assert path.read_bytes() == b"abd"
+
+
+def test_atomic_write_bytes_overwrites_without_o_tmpfile(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "record.core.json"
+    path.write_bytes(b"old")
+
+    def fail(path: Path, data: bytes) -> bool:
+        raise AssertionError("O_TMPFILE path used for an existing target")
+
+    monkeypatch.setattr(utils, "_o_tmpfile_enabled", True)
+    monkeypatch.setattr(utils, "_write_via_o_tmpfile", fail)
+
+    atomic_write_bytes(path, b"new")
+    assert path.read_bytes() == b"new"
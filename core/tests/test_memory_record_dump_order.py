@@ -22,3 +22,22 @@ def test_memory_record_dump_order_is_input_compacted_output() -> None:
     assert (
         dumped.index('"input"') < dumped.index('"compacted"') < dumped.index('"output"')
     )
+
+
+def test_memory_record_prompt_dumps_embed_current_meta_json() -> None:
+    r = MemoryRecord(
+        in_channel="test",
+        id_="--------",
+        parents=["-------0"],
+        input="in",
+        compacted=["c1"],
+        output="out",
+    )
+    r.children.append("-------1")
+
+    meta = r.model_dump_json(include={"id_", "parents", "children"})
+    assert r.dump_raw_pair() == (
+        f"<Meta>{meta}</Meta><Instruct>in</Instruct><Response>out</Response>"
+    )
+    assert r.dump_compated().startswith(f"<Meta>{meta}</Meta>")
+    assert '"children":["-------1"]' in meta
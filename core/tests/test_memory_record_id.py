@@ -4,7 +4,12 @@ from datetime import UTC, datetime, timedelta
 
 import pytest
 
-from k.agent.memory.entities import MemoryRecord, memory_record_id_from_created_at
+from k.agent.memory.entities import (
+    MemoryRecord,
+    is_memory_record_id,
+    memory_record_id_from_created_at,
+    memory_record_id_from_millis,
+)
 
 
 def test_memory_record_id_is_ordered_base64_millis() -> None:
@@ -67,3 +72,27 @@ def test_memory_record_id_rejects_invalid_ids() -> None:
             detailed=[],
             created_at=datetime(2026, 1, 1, 0, 0, 0),
         )
+
+
+def test_is_memory_record_id_checks_length_and_alphabet() -> None:
+    assert is_memory_record_id("--------")
+    assert is_memory_record_id("zzzzzzzz")
+    assert not is_memory_record_id("")
+    assert not is_memory_record_id("-------")
+    assert not is_memory_record_id("--------\n")
+    assert not is_memory_record_id("-------=")
+    assert not is_memory_record_id("00000000-0000-0000-0000-000000000000")
+
+
+def test_memory_record_id_uses_exact_millis_for_naive_and_aware_datetimes() -> None:
+    # `timestamp() * 1000` rounds this one down to ...948 in float math.
+    naive = datetime(2004, 10, 28, 21, 16, 28, 949000)
+    whole_seconds = int(naive.replace(microsecond=0).timestamp())
+    assert memory_record_id_from_created_at(naive) == memory_record_id_from_millis(
+        whole_seconds * 1000 + 949
+    )
+
+    aware = naive.replace(tzinfo=UTC)
+    assert memory_record_id_from_created_at(aware) == memory_record_id_from_millis(
+        1_098_998_188_949
+    )
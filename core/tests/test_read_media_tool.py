@@ -94,3 +94,18 @@ async def test_read_media_rejects_empty_strings() -> None:
     out = await read_media(["  "])
 
     assert out == "Invalid media spec: empty string"
+
+
+@pytest.mark.anyio
+async def test_read_media_classifies_url_extensions_without_sniffing() -> None:
+    from pydantic_ai.messages import DocumentUrl
+
+    out = await read_media(["https://example.com/A.JPG", "https://example.com/b.pdf"])
+
+    assert isinstance(out, list)
+    assert isinstance(out[0], ImageUrl)
+    assert isinstance(out[1], DocumentUrl)
+
+    # Generic binary extensions are rejected without any network sniffing.
+    out = await read_media(["https://example.com/blob.bin"])
+    assert out == "Invalid URL/path or not a supported media file."
@@ -106,3 +106,24 @@ async def test_shell_session_interrupt_from_different_task_does_not_crash(
         tg.start_soon(stopper)
 
     assert session.is_closed() is True
+
+
+@pytest.mark.anyio
+async def test_shell_session_next_writes_stdin_chunks_in_order() -> None:
+    session = ShellSession("head -c 4", options=ShellSessionOptions(timeout_seconds=5))
+
+    stdout, _stderr, code = await session.next([b"a\n", b"", b"b\n"])
+
+    assert code == 0
+    assert stdout == b"a\nb\n"
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("wrap", [bytearray, memoryview])
+async def test_shell_session_next_accepts_bytes_like_stdin(wrap) -> None:
+    session = ShellSession("head -c 4", options=ShellSessionOptions(timeout_seconds=5))
+
+    stdout, _stderr, code = await session.next(wrap(b"a\nb\n"))
+
+    assert code == 0
+    assert stdout == b"a\nb\n"
@@ -1,50 +1,154 @@
+import json
+import logging
+import urllib.parse
+
+import anyio
+import httpx
 import pytest
 
-from k.starters.telegram import TelegramBotApi
+from k.starters.telegram import TelegramBotApi, TelegramBotApiError
+from k.starters.telegram.api import _BotTokenRedactingFilter
+
+
+def _api_with_handler(handler) -> TelegramBotApi:
+    return TelegramBotApi(
+        token="test-token",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
 
 
 @pytest.mark.anyio
-async def test_telegram_bot_api_async_wrappers_call_sync_impl(monkeypatch) -> None:
-    api = TelegramBotApi(token="test-token")
-
-    got_me_called = False
-    got_updates: tuple[int | None, int] | None = None
-    got_send_message: tuple[int, str, int | None, str] | None = None
-
-    def fake_get_me_sync(self):
-        nonlocal got_me_called
-        got_me_called = True
-        return {"id": 123, "username": "MyBot"}
-
-    def fake_get_updates_sync(self, *, offset: int | None, timeout_seconds: int):
-        nonlocal got_updates
-        got_updates = (offset, timeout_seconds)
-        return [{"update_id": 1, "message": {"text": "hi"}}]
-
-    def fake_send_message_sync(
-        self,
-        *,
-        chat_id: int,
-        text: str,
-        reply_to_message_id: int | None = None,
-        parse_mode: str = "HTML",
-    ):
-        nonlocal got_send_message
-        got_send_message = (chat_id, text, reply_to_message_id, parse_mode)
-        return {"message_id": 999}
-
-    monkeypatch.setattr(TelegramBotApi, "_get_me_sync", fake_get_me_sync)
-    monkeypatch.setattr(TelegramBotApi, "_get_updates_sync", fake_get_updates_sync)
-    monkeypatch.setattr(TelegramBotApi, "_send_message_sync", fake_send_message_sync)
+async def test_telegram_bot_api_calls_share_one_client() -> None:
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        method = request.url.path.rsplit("/", 1)[-1]
+        result = {
+            "getMe": {"id": 123, "username": "MyBot"},
+            "getUpdates": [{"update_id": 1, "message": {"text": "hi"}}, "junk"],
+            "sendMessage": {"message_id": 999},
+        }[method]
+        return httpx.Response(200, json={"ok": True, "result": result})
+
+    api = _api_with_handler(handler)
+    client = api.client
 
     me = await api.get_me()
-    assert got_me_called is True
     assert me["id"] == 123
 
     updates = await api.get_updates(offset=5, timeout_seconds=12)
-    assert got_updates == (5, 12)
-    assert updates[0]["update_id"] == 1
+    assert updates == [{"update_id": 1, "message": {"text": "hi"}}]
+    assert seen[1].url.path == "/bottest-token/getUpdates"
+    assert seen[1].url.params["offset"] == "5"
+    assert seen[1].url.params["timeout"] == "12"
 
     msg = await api.send_message(chat_id=42, text="hello", reply_to_message_id=7)
-    assert got_send_message == (42, "hello", 7, "HTML")
     assert msg["message_id"] == 999
+    assert seen[2].method == "POST"
+    form = urllib.parse.parse_qs(seen[2].content.decode("utf-8"))
+    assert form == {
+        "chat_id": ["42"],
+        "text": ["hello"],
+        "parse_mode": ["HTML"],
+        "reply_to_message_id": ["7"],
+    }
+
+    assert api.client is client
+    await api.aclose()
+    assert api.client is None
+
+
+@pytest.mark.anyio
+async def test_telegram_bot_api_raises_on_not_ok_payload() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            content=json.dumps({"ok": False, "description": "Unauthorized"}),
+        )
+
+    api = _api_with_handler(handler)
+    with pytest.raises(TelegramBotApiError, match="getMe failed: Unauthorized"):
+        await api.get_me()
+    await api.aclose()
+
+
+@pytest.mark.anyio
+async def test_telegram_bot_api_raises_on_invalid_json() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=b'{"ok": true, "result": \xff')
+
+    api = _api_with_handler(handler)
+    with pytest.raises(TelegramBotApiError, match="getUpdates failed: invalid JSON"):
+        await api.get_updates(offset=None, timeout_seconds=1)
+    await api.aclose()
+
+
+@pytest.mark.anyio
+async def test_stream_updates_prefetches_next_batch_with_advanced_offset() -> None:
+    requests: list[httpx.Request] = []
+    errors: list[TelegramBotApiError] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) == 1:
+            result = [{"update_id": 7}, {"update_id": 9}]
+        else:
+            result = []
+        return httpx.Response(200, json={"ok": True, "result": result})
+
+    api = _api_with_handler(handler)
+    async with api.stream_updates(
+        offset=None, timeout_seconds=1, on_error=errors.append
+    ) as batches:
+        first = await batches.receive()
+        assert [u["update_id"] for u in first] == [7, 9]
+        # The next request goes out while the first batch is still being
+        # handled by the consumer.
+        with anyio.fail_after(1):
+            while len(requests) < 2:
+                await anyio.sleep(0)
+
+    assert "offset" not in requests[0].url.params
+    assert requests[0].url.params["limit"] == "100"
+    assert requests[1].url.params["offset"] == "10"
+    assert errors == []
+    await api.aclose()
+
+
+@pytest.mark.anyio
+async def test_bot_token_redacting_filter_scrubs_request_urls(caplog) -> None:
+    caplog.set_level(logging.DEBUG)
+    caplog.handler.addFilter(_BotTokenRedactingFilter())
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"ok": True, "result": {"id": 1}})
+
+    api = _api_with_handler(handler)
+    await api.get_me()
+    await api.aclose()
+
+    assert "/bot<redacted>/getMe" in caplog.text
+    assert "test-token" not in caplog.text
+
+
+@pytest.mark.anyio
+async def test_stream_updates_exits_cleanly_with_prefetched_batch_pending() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        result = [{"update_id": len(requests)}]
+        return httpx.Response(200, json={"ok": True, "result": result})
+
+    api = _api_with_handler(handler)
+    async with api.stream_updates(offset=None, timeout_seconds=1) as batches:
+        first = await batches.receive()
+        assert [u["update_id"] for u in first] == [1]
+        # Let the poller fetch the next batch and block handing it over.
+        with anyio.fail_after(1):
+            while len(requests) < 2:
+                await anyio.sleep(0)
+        await anyio.sleep(0.01)
+
+    await api.aclose()
@@ -21,6 +21,18 @@ def test_telegram_updates_to_event_joins_updates_by_newline() -> None:
     assert [json.loads(line)["update_id"] for line in lines] == [1, 2]
 
 
+def test_telegram_updates_to_event_matches_single_update_encoding() -> None:
+    updates = [
+        {"update_id": 1, "message": {"text": "你好\n", "chat": {"id": -100}}},
+        {"update_id": 2, "message": {"text": "b", "location": {"latitude": 1.5}}},
+    ]
+
+    event = telegram_updates_to_event(updates, compact=False)
+    assert event.content.split("\n") == [
+        json.dumps(u, ensure_ascii=False, separators=(",", ":")) for u in updates
+    ]
+
+
 def test_telegram_updates_to_event_uses_chat_prefix_for_multi_update_batch() -> None:
     updates = [
         {
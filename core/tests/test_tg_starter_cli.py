@@ -0,0 +1,19 @@
+import pytest
+
+from k.starters.telegram.cli import _parse_chat_ids
+
+
+def test_parse_chat_ids_accepts_comma_and_whitespace_separators() -> None:
+    assert _parse_chat_ids("1, -1002,\n3  +4,") == {1, -1002, 3, 4}
+
+
+@pytest.mark.parametrize("raw", ["12a34", "1-2", "x2", "1,,abc", "-"])
+def test_parse_chat_ids_rejects_malformed_entries(raw: str) -> None:
+    with pytest.raises(ValueError, match="Invalid chat_id entry"):
+        _parse_chat_ids(raw)
+
+
+def test_parse_chat_ids_returns_read_only_set() -> None:
+    chat_ids = _parse_chat_ids("7 7 8")
+    assert isinstance(chat_ids, frozenset)
+    assert chat_ids == {7, 8}
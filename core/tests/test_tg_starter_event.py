@@ -1,7 +1,10 @@
 import json
 from datetime import UTC
 
-from k.starters.telegram import telegram_update_to_event_json
+from k.starters.telegram import (
+    telegram_update_to_event,
+    telegram_update_to_event_json,
+)
 
 
 def test_telegram_update_to_event_json_roundtrip() -> None:
@@ -162,3 +165,30 @@ def test_telegram_event_keeps_media_file_id_but_drops_size_noise() -> None:
     assert "file_size" not in body["message"]["document"]
     assert "file_name" not in body["message"]["document"]
     assert "mime_type" not in body["message"]["document"]
+
+
+def test_telegram_update_to_event_json_matches_event_model_dump() -> None:
+    updates = [
+        {
+            "update_id": 600,
+            "message": {
+                "message_id": 3,
+                "chat": {"id": -1001886218691, "type": "supergroup"},
+                "is_topic_message": True,
+                "message_thread_id": 17,
+                "date": 1_700_000_000,
+                "text": 'quote " slash \\ h\u00e9 \u2028',
+            },
+        },
+        {"update_id": 601, "custom": {"payload": "no-chat"}},
+    ]
+
+    for update in updates:
+        for compact in (True, False):
+            expected = telegram_update_to_event(
+                update, compact=compact, tz=UTC
+            ).model_dump_json()
+            assert (
+                telegram_update_to_event_json(update, compact=compact, tz=UTC)
+                == expected
+            )
@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 
 import pytest
@@ -38,6 +39,27 @@ def test_append_and_load_recent_updates_grouped_by_chat_id(tmp_path) -> None:
     assert [u["update_id"] for u in grouped[None]] == [6]
 
 
+def test_append_updates_jsonl_writes_compact_utf8_lines(tmp_path) -> None:
+    path = tmp_path / "updates.jsonl"
+    path.write_bytes(b'{"update_id":0}\n')
+    updates = [
+        {"update_id": 1, "message": {"text": "h\u00e9 \u2028 \U0001f600"}},
+        {"update_id": 2, "edited": True},
+    ]
+
+    assert append_updates_jsonl(path, updates) == 2
+    assert path.read_bytes() == b"".join(
+        [
+            b'{"update_id":0}\n',
+            *(
+                json.dumps(u, ensure_ascii=False, separators=(",", ":")).encode()
+                + b"\n"
+                for u in updates
+            ),
+        ]
+    )
+
+
 def test_load_recent_updates_grouped_by_chat_id_missing_file_returns_empty(
     tmp_path,
 ) -> None: